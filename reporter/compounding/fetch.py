@@ -1,6 +1,12 @@
 import json
 from reporter.models.SafeTx import MerkeDistributorClaimMultiDelegatedTx
-from reporter.queries import get_unclaimed_delegated_recipients
+from reporter.env import HTTP
+from reporter.queries import (
+    get_unclaimed_delegated_recipients,
+    network_telemetry,
+    transport_mode,
+    TransportMode,
+)
 from reporter.models import (
     AUXO_TOKEN_NAMES,
     RecipientWriter,
@@ -35,7 +41,9 @@ def get_compound_claims(
     conf: CompoundConf, token: AUXO_TOKEN_NAMES
 ) -> RecipientMerkleClaim:
     tree = read_tree(conf, token)
-    recipients = get_unclaimed_delegated_recipients(tree, conf, token)
+    archive = f"{conf.directory}/{conf.date}/inputs.json.gz"
+    with transport_mode(TransportMode(HTTP.MODE), archive):
+        recipients = get_unclaimed_delegated_recipients(tree, conf, token)
     return recipients
 
 
@@ -63,4 +71,5 @@ def fetch_and_write_compounders(conf: CompoundConf, token: AUXO_TOKEN_NAMES):
     filename = writer.to_json(recipient_dict, f"recipients-{token}")
 
     create_multi_delegated_tx(conf, token, recipients)
+    network_telemetry.write(f"{conf.directory}/{conf.date}/perf", conf.date)
     return filename
@@ -1,4 +1,3 @@
-from decimal import Decimal
 import json
 from typing import cast
 from reporter.models import (
@@ -32,11 +31,8 @@ def recipients_to_accounts(recipients: RecipientMerkleClaim) -> list[Account]:
 
 
 def compute_pro_rata_auxo(recipients: RecipientMerkleClaim, total_rewards: BigNumber):
-    total_weth = sum(Decimal(recipient.rewards) for recipient in recipients.values())
     accounts = recipients_to_accounts(recipients)
-    return compute_rewards(
-        PRV(amount=total_rewards), total_weth or Decimal(0), accounts
-    )
+    return compute_rewards(PRV(amount=total_rewards), accounts)
 
 
 def distribute_compounded_auxo(
@@ -32,10 +32,63 @@ class ADDRESSES:
 
 
 class SUBGRAPHS:
-    SNAPSHOT = "https://hub.snapshot.org/graphql"
+    SNAPSHOT = env_var("SUBGRAPH_SNAPSHOT") or "https://hub.snapshot.org/graphql"
     AUXO_STAKING = env_var("SUBGRAPH_AUXO_STAKING")
     AUXO_GOV = env_var("SUBGRAPH_AUXO_GOV")
 
 
+class HTTP:
+    TIMEOUT = float(env_var("HTTP_TIMEOUT") or 30)
+    MAX_RETRIES = int(env_var("HTTP_MAX_RETRIES") or 5)
+    BACKOFF = float(env_var("HTTP_BACKOFF") or 0.5)
+    MAX_BACKOFF = float(env_var("HTTP_MAX_BACKOFF") or 30)
+    # seconds an endpoint is avoided for after failing, when a source lists several
+    FAILOVER_COOLDOWN = float(env_var("HTTP_FAILOVER_COOLDOWN") or 30)
+    # also send block-pinned requests to a second endpoint when the first is slower than usual
+    HEDGE = env_var("HTTP_HEDGE") == "TRUE"
+    # 'live', 'record' or 'replay', see reporter/queries/recording.py
+    MODE = env_var("TRANSPORT_MODE") or "live"
+
+
+class GRAPHQL:
+    # number of keyspace ranges large queries are split into and fetched concurrently
+    SHARDS = int(env_var("GRAPHQL_SHARDS") or 16)
+    # shards in flight at once, every shard by default
+    CONCURRENCY = int(env_var("GRAPHQL_CONCURRENCY") or SHARDS)
+    # pages of 1000 rows fetched in each round trip, as aliased copies of the query
+    PAGES_PER_REQUEST = int(env_var("GRAPHQL_PAGES_PER_REQUEST") or 5)
+
+
+class MULTICALL:
+    # Multicall3 is deployed at the same address on every chain
+    ADDRESS = (
+        env_var("MULTICALL_ADDRESS") or "0xcA11bde05977b3631167028862bE2a173976CA11"
+    )
+    # contract reads sent in each aggregate eth_call, and aggregate calls in flight at once
+    BATCH_SIZE = int(env_var("MULTICALL_BATCH_SIZE") or 500)
+    CONCURRENCY = int(env_var("MULTICALL_CONCURRENCY") or 4)
+    # 'aggregate' packs reads into Multicall3 calls, 'batch' sends plain eth_calls in JSON-RPC batches
+    ENGINE = env_var("MULTICALL_ENGINE") or "aggregate"
+    # eth_calls in each JSON-RPC batch, and batches in flight at once, for the 'batch' engine
+    RPC_BATCH_SIZE = int(env_var("MULTICALL_RPC_BATCH_SIZE") or 100)
+    RPC_CONCURRENCY = int(env_var("MULTICALL_RPC_CONCURRENCY") or 4)
+
+
+class COMPOUND:
+    # 'two_phase', 'single_pass', or 'auto' to pick by tree size, see reporter/queries/compound.py
+    SCAN = env_var("COMPOUND_SCAN") or "auto"
+
+
+class CACHE:
+    DIRECTORY = env_var("CACHE_DIR") or ".cache"
+    MAX_BYTES = int(env_var("CACHE_MAX_MB") or 512) * 1024 * 1024
+    BYPASS = env_var("CACHE_BYPASS") == "TRUE"
+
+
+class TELEMETRY:
+    # node exporter textfile collector directory, network metrics are copied here when set
+    PROMETHEUS_TEXTFILE_DIR = env_var("PROMETHEUS_TEXTFILE_DIR")
+
+
 SNAPSHOT_SPACE_ID = env_var("SNAPSHOT_SPACE_ID")
 RPC_URL = env_var("RPC_URL")
@@ -1,3 +1,6 @@
+from typing import Optional
+
+
 class EmptyQueryError(Exception):
     """Raise if GraphQL Query returns no results"""
 
@@ -10,6 +13,12 @@ class TooManyLoopsError(Exception):
     pass
 
 
+class PaginationStalledError(Exception):
+    """Raise if a page of rows all share the cursor value, so paging on it can't move forward"""
+
+    pass
+
+
 class MissingRewardException(Exception):
     """Raise if a reward token is not found in a user's list of rewards"""
 
@@ -42,3 +51,29 @@ class MissingDBException(Exception):
 
 class MissingSummaryError(Exception):
     pass
+
+
+class TransportError(Exception):
+    """Raise if an HTTP request still fails after all retries"""
+
+    pass
+
+
+class EndpointUnavailable(TransportError):
+    """Raise if a single endpoint failed a request in a way worth retrying, eg: a 503 or a dropped connection"""
+
+    def __init__(self, reason: str, retry_after: Optional[str] = None):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class SubgraphBehindError(Exception):
+    """Raise if a subgraph has not yet indexed the block a report is pinned to"""
+
+    pass
+
+
+class ReplayMissError(Exception):
+    """Raise if a request being replayed was not captured in the recording"""
+
+    pass
@@ -1,10 +1,9 @@
 from __future__ import annotations
 from enum import Enum
 from typing import Union
-from pydantic import BaseModel, validator
-import eth_utils as eth
+from pydantic import BaseModel
 
-from reporter.models.types import EthereumAddress
+from reporter.models.types import Address
 from reporter.models.ERC20 import PRV, ARV, ERC20Amount
 
 
@@ -21,12 +20,7 @@ class AccountState(str, Enum):
 class User(BaseModel):
     """Base class for a user with an eth address"""
 
-    address: EthereumAddress
-
-    @validator("address")
-    @classmethod
-    def checksum_address(cls, input: str):
-        return eth.to_checksum_address(input)
+    address: Address
 
 
 class Staker(User):
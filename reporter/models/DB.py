@@ -68,9 +68,9 @@ class DB(TinyDB):
     ):
         self.table("ARV_stats").insert(
             {
-                "stakers": len([s.dict() for s in stakers]),
-                "votes": len([v.dict() for v in votes]),
-                "proposals": len([p.dict() for p in proposals]),
+                "stakers": len(stakers),
+                "votes": len(votes),
+                "proposals": len(proposals),
                 "voters": len(voters),
                 "non_voters": len(non_voters),
                 "rewards": rewards.dict(),
@@ -2,11 +2,10 @@ from __future__ import annotations
 
 from typing import Literal, Optional, Union
 
-import eth_utils as eth
-from pydantic import BaseModel, validator
+from pydantic import BaseModel
 
 from reporter.env import ADDRESSES
-from reporter.models.types import BigNumber, EthereumAddress
+from reporter.models.types import Address, BigNumber
 
 AUXO_TOKEN_NAMES = Union[Literal["ARV"], Literal["PRV"]]
 
@@ -14,14 +13,9 @@ AUXO_TOKEN_NAMES = Union[Literal["ARV"], Literal["PRV"]]
 class BaseERC20(BaseModel):
     """Simply holds the token address alongside an identifier"""
 
-    address: EthereumAddress
+    address: Address
     symbol: str
 
-    @validator("address")
-    @classmethod
-    def checksum_token(cls, addr: EthereumAddress):
-        return eth.to_checksum_address(addr)
-
 
 class ERC20Metadata(BaseERC20):
     """Adds additional metadata about the token"""
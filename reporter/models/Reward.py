@@ -7,17 +7,36 @@ from reporter.models.types import BigNumber
 from reporter.models.ERC20 import ERC20Amount
 
 
+class BalanceDistribution(BaseModel):
+    """
+    Spread of the token balances held by accounts
+    :param `min`: smallest balance
+    :param `max`: largest balance
+    :param `percentiles`: balance at each percentile, eg: {"p50": "1000"} for the median
+    """
+
+    min: BigNumber = "0"
+    max: BigNumber = "0"
+    percentiles: dict[str, BigNumber] = {}
+
+
 class TokenSummaryStats(BaseModel):
     """
     Summarizes Token positions for active and inactive statuses
     :param `total`: total Tokens in circulation at block number
     :param `active`: total Tokens belonging to users that voted/eligible for rewards
     :param `inactive`: total Tokens belonging to user that did not vote. Their rewards will be redistributed.
+    :param `accounts`: number of accounts holding tokens, split into `active_accounts` and `inactive_accounts`
+    :param `balances`: spread of the balances of those accounts
     """
 
     total: BigNumber
     active: BigNumber
     inactive: BigNumber
+    accounts: int = 0
+    active_accounts: int = 0
+    inactive_accounts: int = 0
+    balances: BalanceDistribution = BalanceDistribution()
 
 
 class RewardSummary(ERC20Amount):
@@ -27,9 +46,12 @@ class RewardSummary(ERC20Amount):
 
     Note: because tokens may have different decimal values, it can be tricky to display.
     For fractional reward tokens, we preserve the fraction up to 18 decimal points.
+
+    `dust` is the part of the rewards left over from rounding each account down to whole units.
     """
 
     pro_rata: BigNumber
+    dust: BigNumber = "0"
 
     @validator("pro_rata")
     @classmethod
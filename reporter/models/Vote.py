@@ -1,9 +1,13 @@
 from typing import Optional
 
-import eth_utils as eth
 from pydantic import BaseModel, validator
 
-from reporter.models.types import EthereumAddress, IDAddressDict
+from reporter.models.types import (
+    Address,
+    EthereumAddress,
+    IDAddressDict,
+    to_checksum_address,
+)
 
 
 class Proposal(BaseModel):
@@ -16,17 +20,12 @@ class Proposal(BaseModel):
 
     id: str
     title: str
-    author: EthereumAddress
+    author: Address
     created: int
     start: int
     end: int
     choices: Optional[list[str]]
 
-    @validator("author")
-    @classmethod
-    def checksum_id(cls, _author: str) -> str:
-        return eth.to_checksum_address(_author)
-
 
 class Vote(BaseModel):
     """
@@ -39,16 +38,11 @@ class Vote(BaseModel):
     :param `created`: when the vote was created
     """
 
-    voter: EthereumAddress
+    voter: Address
     choice: int
     created: int
     proposal: Proposal
 
-    @validator("voter")
-    @classmethod
-    def checksum_id(cls, _voter: str) -> str:
-        return eth.to_checksum_address(_voter)
-
 
 class OnChainProposal(BaseModel):
     """
@@ -67,7 +61,7 @@ class OnChainProposal(BaseModel):
     @validator("proposer")
     @classmethod
     def checksum_id(cls, _proposerDict: IDAddressDict) -> str:
-        return eth.to_checksum_address(_proposerDict["id"])
+        return to_checksum_address(_proposerDict["id"])
 
     @validator("proposalCreated")
     @classmethod
@@ -112,12 +106,12 @@ class OnChainVote(BaseModel):
     @validator("governor")
     @classmethod
     def flatten_governor(cls, governor: IDAddressDict) -> EthereumAddress:
-        return eth.to_checksum_address(governor["id"])
+        return to_checksum_address(governor["id"])
 
     @validator("voter")
     @classmethod
     def flatten_voter(cls, voter: IDAddressDict) -> EthereumAddress:
-        return eth.to_checksum_address(voter["id"])
+        return to_checksum_address(voter["id"])
 
     def coerce_to_vote(self) -> Vote:
         return Vote(
@@ -134,15 +128,5 @@ class Delegate(BaseModel):
     In these specific instances, we allow `delegates` to vote on behalf of `delegators`.
     """
 
-    delegator: EthereumAddress
-    delegate: EthereumAddress
-
-    @validator("delegator")
-    @classmethod
-    def checksum_delegator(cls, d: str) -> str:
-        return eth.to_checksum_address(d)
-
-    @validator("delegate")
-    @classmethod
-    def checksum_delegate(cls, d: str) -> str:
-        return eth.to_checksum_address(d)
+    delegator: Address
+    delegate: Address
@@ -1,4 +1,7 @@
-from typing import Literal, Any
+import re
+from typing import TYPE_CHECKING, Literal, Any
+
+from eth_hash.auto import keccak
 
 # type aliases for clarity
 EthereumAddress = str
@@ -6,3 +9,56 @@ BigNumber = str
 IDAddressDict = dict[Literal["id"], EthereumAddress]
 GraphQL_Response = dict[Literal["data"], Any]
 Bytes32 = str
+
+HEX_ADDRESS = re.compile(r"(?:0[xX])?([0-9a-fA-F]{40})")
+
+# the checksum of every address seen, keyed on its 20 bytes so each address has a single string
+# however it is spelled, and the cache grows no larger than the number of distinct addresses
+_CHECKSUMS: dict[bytes, EthereumAddress] = {}
+
+
+def to_checksum_address(address: str) -> EthereumAddress:
+    """
+    EIP-55 checksum of a hex address, as `eth_utils.to_checksum_address`.
+    Importing eth_utils takes longer than creating an epoch folder, so the models checksum here.
+
+    Checksums are interned: the keccak runs once per address, and every model holding
+    the address shares the same string however it was spelled when read.
+    """
+    match = HEX_ADDRESS.fullmatch(address) if isinstance(address, str) else None
+    if match is None:
+        raise ValueError(f"Unknown format {address}, expected a hex address")
+    raw = bytes.fromhex(match.group(1))
+
+    checksum = _CHECKSUMS.get(raw)
+    if checksum is None:
+        lower = raw.hex()
+        digest = keccak(lower.encode()).hex()
+        checksum = _CHECKSUMS.setdefault(
+            raw,
+            "0x"
+            + "".join(
+                c.upper() if int(d, 16) >= 8 else c for c, d in zip(lower, digest)
+            ),
+        )
+    return checksum
+
+
+if TYPE_CHECKING:
+    # validated fields hold plain strings, so type checkers treat them as one
+    Address = EthereumAddress
+else:
+
+    class Address(str):
+        """
+        Pydantic field type for an address, validated to its interned checksum with `to_checksum_address`.
+        Use it for any field holding an eth address instead of a `checksum_*` validator.
+        """
+
+        @classmethod
+        def __get_validators__(cls):
+            yield to_checksum_address
+
+        @classmethod
+        def __modify_schema__(cls, field_schema: dict[str, Any]) -> None:
+            field_schema.update(type="string", pattern=HEX_ADDRESS.pattern)
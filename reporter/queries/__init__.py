@@ -1,6 +1,9 @@
-# from reporter.queries.common import *
-# from reporter.queries.total_supply import *
-# from reporter.queries.voters import *
-# from reporter.queries.prv_stakers import *
-# from reporter.queries.arv_stakers import *
-# from reporter.queries.compound import *
+from reporter.queries.common import *
+from reporter.queries.telemetry import *
+from reporter.queries.block_snapshot import *
+from reporter.queries.total_supply import *
+from reporter.queries.voters import *
+from reporter.queries.prv_stakers import *
+from reporter.queries.arv_stakers import *
+from reporter.queries.compound import *
+from reporter.queries.recording import *
@@ -0,0 +1,178 @@
+import re
+from typing import Any, Callable, Optional, Sequence, Union
+
+from eth_hash.auto import keccak
+
+from reporter.models.types import to_checksum_address
+
+"""
+`multicall.Call` parses its signature and runs the ABI codec for every call it encodes or decodes,
+which adds up once we read the same function for tens of thousands of addresses.
+
+Our reads only take and return static types, where every value is a single 32 byte word.
+`RawCall` parses a signature once, packs the arguments of each call straight into words
+and slices results out of the returned bytes. The `aggregate` request and response
+are likewise built and read as whole buffers.
+"""
+
+WORD = 32
+
+SIGNATURE = re.compile(r"^(\w+)\((.*?)\)(?:\((.*)\))?$")
+
+# a static value taking a single word, eg: uint256, uint32, bool, address, bytes32
+StaticType = str
+OutputType = Union[StaticType, tuple]
+
+
+def selector(signature: str) -> bytes:
+    """4 byte function selector, eg: `selector("balanceOf(address)")`"""
+    return keccak(signature.encode())[:4]
+
+
+def word(value: int) -> bytes:
+    return value.to_bytes(WORD, "big")
+
+
+def encode_word(abi_type: StaticType, value: Any) -> bytes:
+    if abi_type == "address":
+        return bytes.fromhex(value[2:]).rjust(WORD, b"\0")
+    if abi_type == "bytes32":
+        return bytes.fromhex(value[2:]) if isinstance(value, str) else bytes(value)
+    # uintN, intN and bool, negative ints are two's complement
+    return int(value).to_bytes(WORD, "big", signed=abi_type.startswith("int"))
+
+
+def decode_word(abi_type: StaticType, data: bytes) -> Any:
+    if abi_type == "address":
+        return to_checksum_address("0x" + data[12:].hex())
+    if abi_type == "bool":
+        return data != bytes(WORD)
+    if abi_type == "bytes32":
+        return data
+    return int.from_bytes(data, "big", signed=abi_type.startswith("int"))
+
+
+def is_static(abi_type: StaticType) -> bool:
+    return abi_type in ("address", "bool", "bytes32") or bool(
+        re.fullmatch(r"u?int\d*", abi_type)
+    )
+
+
+def split_types(types: str) -> list[str]:
+    """Split a type list on its top level commas, leaving tuples whole"""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(types):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            parts.append(types[start:i])
+            start = i + 1
+    if types:
+        parts.append(types[start:])
+    return parts
+
+
+def parse_output(abi_type: str) -> OutputType:
+    if abi_type.startswith("("):
+        return tuple(parse_output(t) for t in split_types(abi_type[1:-1]))
+    if not is_static(abi_type):
+        raise ValueError(f"Only static types can be decoded in bulk, got {abi_type}")
+    return abi_type
+
+
+def width(output: OutputType) -> int:
+    """Number of words taken by a static output"""
+    return 1 if isinstance(output, str) else sum(width(t) for t in output)
+
+
+def decode_output(output: OutputType, data: bytes, start: int = 0) -> Any:
+    if isinstance(output, str):
+        return decode_word(output, data[start : start + WORD])
+    values, offset = [], start
+    for member in output:
+        values.append(decode_output(member, data, offset))
+        offset += width(member) * WORD
+    return tuple(values)
+
+
+class RawCall:
+    """
+    A contract function read many times with different arguments, eg: `balanceOf(address)` for every staker.
+    :param `target`: the contract to call
+    :param `signature`: in the format used by `multicall.Call`, eg: `lockOf(address)((uint192,uint32,uint32))`
+    :param `handler`: applied to each decoded result, eg: `to_lock`
+    """
+
+    def __init__(
+        self,
+        target: str,
+        signature: str,
+        handler: Optional[Callable[[Any], Any]] = None,
+    ):
+        match = SIGNATURE.match(signature.replace(" ", ""))
+        if match is None:
+            raise ValueError(f"Invalid signature {signature}")
+        name, inputs, outputs = match.groups()
+
+        self.target = to_checksum_address(target)
+        self.signature = signature
+        self.inputs = split_types(inputs)
+        if not all(is_static(t) for t in self.inputs):
+            raise ValueError(f"Only static types can be encoded in bulk: {signature}")
+        self.outputs = [parse_output(t) for t in split_types(outputs or "")]
+        self.size = sum(width(o) for o in self.outputs) * WORD
+        self.selector = selector(f"{name}({inputs})")
+        self.handler = handler
+
+    def __repr__(self) -> str:
+        return f"<RawCall {self.signature} on {self.target[:8]}>"
+
+    def encode(self, *args: Any) -> bytes:
+        return self.selector + b"".join(
+            encode_word(t, a) for t, a in zip(self.inputs, args)
+        )
+
+    def decode(self, data: bytes) -> Any:
+        """
+        A single output is returned as-is, several as a tuple, like `multicall.Call`.
+        Calls returning too little data (eg: to an address with no code) decode to `None`.
+        """
+        if len(data) < self.size:
+            return None
+        values = decode_output(tuple(self.outputs), data)
+        value = values[0] if len(values) == 1 else values
+        return self.handler(value) if self.handler else value
+
+
+def padded(data: bytes) -> bytes:
+    return data + bytes(-len(data) % WORD)
+
+
+def encode_aggregate(selector: bytes, calls: Sequence[tuple[str, bytes]]) -> bytes:
+    """Calldata for Multicall3 `aggregate((address,bytes)[])`, from (target, calldata) pairs"""
+    offsets, tuples, offset = [], [], WORD * len(calls)
+    for target, data in calls:
+        encoded = (
+            bytes.fromhex(target[2:]).rjust(WORD, b"\0")
+            + word(2 * WORD)  # offset of the calldata within the tuple
+            + word(len(data))
+            + padded(data)
+        )
+        offsets.append(word(offset))
+        tuples.append(encoded)
+        offset += len(encoded)
+    return b"".join([selector, word(WORD), word(len(calls)), *offsets, *tuples])
+
+
+def decode_aggregate(data: bytes) -> list[bytes]:
+    """The `bytes[]` returned by `aggregate`, skipping the block number"""
+    array = int.from_bytes(data[WORD : 2 * WORD], "big")
+    count = int.from_bytes(data[array : array + WORD], "big")
+    start = array + WORD
+    outputs = []
+    for i in range(count):
+        offset = start + int.from_bytes(
+            data[start + i * WORD : start + (i + 1) * WORD], "big"
+        )
+        length = int.from_bytes(data[offset : offset + WORD], "big")
+        outputs.append(bytes(data[offset + WORD : offset + WORD + length]))
+    return outputs
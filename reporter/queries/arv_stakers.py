@@ -1,10 +1,14 @@
-from typing import Any, Union, cast
-from multicall import Call, Multicall  # type: ignore
+from typing import Optional, Union, cast
 
 from reporter.env import ADDRESSES
 from reporter.errors import MissingBoostBalanceException
 from reporter.models import Config, EthereumAddress, ARVStaker, ARV, Lock
-from reporter.queries import get_token_hodlers, w3
+from reporter.queries import (
+    RawCall,
+    SnapshotReader,
+    multicall_raw,
+    stream_token_hodlers,
+)
 
 """
 ARV Stakers get their total balance from the DecayOracle. 
@@ -17,14 +21,30 @@ as well as their decayed/boosted balance, which is what we use to calculate rewa
 def get_arv_stakers(conf: Config) -> list[ARVStaker]:
     """
     Fetch the list of ARV token holders at the given block number
+    Stakers are built as each page arrives, then ordered with the largest holders first.
     """
-    arv: list[Any] = get_token_hodlers(conf, ADDRESSES.ARV)
-    return [ARVStaker(v["valueExact"], address=v["account"]["id"]) for v in arv]
+    stakers = [
+        ARVStaker(v["valueExact"], address=v["account"]["id"])
+        for v in stream_token_hodlers(conf, ADDRESSES.ARV)
+    ]
+    return sorted(stakers, key=lambda s: int(s.token.amount), reverse=True)
 
 
 MulticallReturnBoost = dict[EthereumAddress, Union[int, str]]
 
 
+def boosted_balance() -> RawCall:
+    """DecayOracle read of the boosted/decayed ARV balance of an address"""
+    return RawCall(ADDRESSES.DECAY_ORACLE, "balanceOf(address)(uint256)")
+
+
+def lock() -> RawCall:
+    """TokenLocker read of the lock held by an address, as a `Lock`"""
+    return RawCall(
+        ADDRESSES.TOKEN_LOCKER, "lockOf(address)((uint192,uint32,uint32))", to_lock
+    )
+
+
 def get_boosted_lock(
     stakers: list[ARVStaker],
     block_number: int,
@@ -33,20 +53,11 @@ def get_boosted_lock(
     Multicall out to the DecayOracle to fetch the boosted/decayed balance of ARV for each address
     """
 
-    calls = [
-        Call(
-            # address to call:
-            ADDRESSES.DECAY_ORACLE,  # this needs to be the oracle address
-            # signature + return value, with argument:
-            ["balanceOf(address)(uint256)", s.address],
-            # return in a format of {[address]: uint}:
-            [[s.address, None]],
-        )
-        for s in stakers
-    ]
+    balance_of = boosted_balance()
+    reads = [(s.address, balance_of, (s.address,)) for s in stakers]
 
-    # Immediately execute the multicall
-    return Multicall(calls, _w3=w3, block_id=block_number)()
+    # Immediately execute the multicall, in the format of {[address]: uint}
+    return multicall_raw(reads, block_number, name="arv_boosted_balances")
 
 
 def apply_boost(
@@ -92,20 +103,53 @@ def get_locks(
     return array of locks for a given list of stakers
     """
 
-    calls = [
-        Call(
-            # address to call:
-            ADDRESSES.TOKEN_LOCKER,
-            # signature + return value, with argument:
-            ["lockOf(address)((uint192,uint32,uint32))", s],
-            # return in a format of {[address]: (amount, lockedAt, lockDuration))}:
-            [[s, to_lock]],
+    lock_of = lock()
+    reads = [(address, lock_of, (address,)) for address in addresses]
+
+    # Immediately execute the multicall, in the format of {[address]: Lock}
+    return multicall_raw(reads, conf.block_snapshot, name="arv_locks")
+
+
+def get_locks_and_boosted_balances(
+    addresses: list[EthereumAddress],
+    block_number: int,
+    reader: Optional[SnapshotReader] = None,
+) -> tuple[dict[EthereumAddress, Lock], MulticallReturnBoost]:
+    """
+    Fetch the lock and the boosted balance of each address in a single pass.
+    Both reads for an address sit next to each other in the same aggregate batches,
+    so the ARV stage needs half the round trips of `get_locks` followed by `get_boosted_lock`.
+    :param `reader`: if passed, reads queued on it are sent in the same multicall
+    :returns: the locks and the boosted balances, in the formats of `get_locks` and `get_boosted_lock`
+    """
+
+    lock_of, balance_of = lock(), boosted_balance()
+    reads = [
+        read
+        for address in addresses
+        for read in (
+            (("lock", address), lock_of, (address,)),
+            (("boost", address), balance_of, (address,)),
         )
-        for s in addresses
     ]
 
-    # Immediately execute the multicall
-    return Multicall(calls, _w3=w3, block_id=conf.block_snapshot)()
+    if reader is not None:
+        results = reader.read(reads, name="arv_locks_and_boosts")
+    else:
+        results = multicall_raw(reads, block_number, name="arv_locks_and_boosts")
+    locks = {address: results[("lock", address)] for address in addresses}
+    boosts = {address: results[("boost", address)] for address in addresses}
+    return locks, boosts
+
+
+def apply_locks(
+    stakers: list[ARVStaker], locks: dict[EthereumAddress, Lock]
+) -> list[ARVStaker]:
+    """Add the lock fetched for each staker to their ARV"""
+    for s in stakers:
+        cast(ARV, s.token).lock = locks[s.address]
+
+    return stakers
 
 
 def add_locks_to_stakers(stakers: list[ARVStaker], conf: Config) -> list[ARVStaker]:
@@ -120,18 +164,22 @@ def add_locks_to_stakers(stakers: list[ARVStaker], conf: Config) -> list[ARVStak
     locks = get_locks(addresses, conf)
 
     # add the locks to the accounts
-    for s in stakers:
-        cast(ARV, s.token).lock = locks[s.address]
-
-    return stakers
+    return apply_locks(stakers, locks)
 
 
-def boost_stakers(stakers: list[ARVStaker], mock=False) -> list[ARVStaker]:
-    boost_data = get_boosted_lock(stakers, mock)
+def boost_stakers(stakers: list[ARVStaker], block_number: int) -> list[ARVStaker]:
+    boost_data = get_boosted_lock(stakers, block_number)
     return apply_boost(stakers, boost_data)
 
 
-def get_arv_stakers_and_boost(config: Config) -> list[ARVStaker]:
+def get_arv_stakers_and_boost(
+    config: Config, reader: Optional[SnapshotReader] = None
+) -> list[ARVStaker]:
+    """
+    Fetch ARV stakers with their locks and boosted balances, all read at `config.block_snapshot`
+    """
     stakers = get_arv_stakers(config)
-    stakers_with_locks = add_locks_to_stakers(stakers, config)
-    return boost_stakers(stakers_with_locks, config.block_snapshot)
+    locks, boosts = get_locks_and_boosted_balances(
+        [s.address for s in stakers], config.block_snapshot, reader
+    )
+    return apply_boost(apply_locks(stakers, locks), boosts)
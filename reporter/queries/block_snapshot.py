@@ -0,0 +1,84 @@
+from threading import Lock as _Lock
+from typing import Any, Sequence, cast
+
+from reporter.errors import SubgraphBehindError
+from reporter.models import Config
+from reporter.queries.common import RawCall, multicall_raw, post_graphql
+
+"""
+Every number in a report should come from the same block, `config.block_snapshot`.
+
+The subgraph queries are pinned to that block, but a subgraph still catching up would only fail
+part way through a run, so each one is checked to have indexed the block before anything is fetched.
+
+Reads of a single value, such as a total supply, don't need an eth_call of their own:
+they are queued on the reader and sent in the same aggregates as the next per-address multicall.
+"""
+
+META_QUERY = "{ _meta { block { number } } }"
+
+
+def indexed_block(url: str) -> int:
+    """The latest block the subgraph at `url` has indexed"""
+    # `_meta` is a single object rather than a list of rows
+    meta = cast(
+        dict[str, Any],
+        post_graphql(url, dict(query=META_QUERY, variables={}), ["_meta"]),
+    )
+    return int(meta["block"]["number"])
+
+
+class SnapshotReader:
+    """
+    Contract and subgraph reads for one run, all pinned to `conf.block_snapshot`.
+    Queue single reads with `add`, they are fetched by the next `read` and returned by `get`.
+    """
+
+    def __init__(self, conf: Config):
+        self.block = conf.block_snapshot
+        self.values: dict[str, Any] = {}
+        self._pending: dict[str, tuple[RawCall, tuple]] = {}
+        self._checked: set[str] = set()
+        self._lock = _Lock()
+
+    def check_subgraphs(self, *urls: str) -> None:
+        """Raise before the run starts if a subgraph hasn't indexed the snapshot block yet"""
+        for url in urls:
+            if url in self._checked:
+                continue
+            indexed = indexed_block(url)
+            if indexed < self.block:
+                raise SubgraphBehindError(
+                    f"{url} is indexed up to block {indexed}, behind the snapshot at {self.block}"
+                )
+            self._checked.add(url)
+
+    def add(self, key: str, call: RawCall, *args: Any) -> None:
+        """Queue a single read, eg: `reader.add("prv_total_supply", total_supply(ADDRESSES.PRV))`"""
+        with self._lock:
+            if key not in self.values:
+                self._pending[key] = (call, args)
+
+    def read(
+        self, reads: Sequence[tuple[Any, RawCall, tuple]], name: str
+    ) -> dict[Any, Any]:
+        """
+        `multicall_raw` at the snapshot block, with the queued single reads sent alongside `reads`
+        :returns: the results of `reads` only, queued reads are kept for `get`
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        # keyed on the reader as well, so they can't collide with the keys of `reads`
+        queued = [((self, key), call, args) for key, (call, args) in pending.items()]
+        results = multicall_raw([*queued, *reads], self.block, name=name)
+        with self._lock:
+            for key in pending:
+                self.values[key] = results.pop((self, key))
+        return results
+
+    def get(self, key: str) -> Any:
+        """The result of a queued read, fetched on its own if no multicall has been made since it was added"""
+        if key not in self.values:
+            self.read([], name="snapshot_reads")
+        return self.values[key]
@@ -0,0 +1,101 @@
+"""
+Queries pinned to a block, or bounded by timestamps in the past, always return the same data,
+as do contract reads at a fixed block.
+Their responses are stored on disk, so reruns of an epoch don't need to touch the network.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional
+
+from reporter.env import CACHE
+
+
+class ResponseCache:
+    """
+    Content addressed on-disk cache of raw response bodies
+    :param `directory`: where entries are stored, one file per key
+    :param `max_bytes`: least recently used entries are evicted once the cache grows past this
+    :param `bypass`: never read or write entries, always go to the network
+    """
+
+    def __init__(self, directory: str, max_bytes: int, bypass: bool = False):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self._size: Optional[int] = None
+        self._lock = Lock()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """sha256 over the canonical JSON of the parts, with whitespace in strings collapsed"""
+        normalized = [" ".join(p.split()) if isinstance(p, str) else p for p in parts]
+        canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        if self.bypass:
+            return None
+        path = self.path(key)
+        try:
+            body = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # mark as recently used for eviction
+        os.utime(path)
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        if self.bypass:
+            return
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            size = self.size()
+            if path.exists():
+                size -= path.stat().st_size
+
+            # write then rename so a crashed run never leaves a partial entry behind
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+
+            self._size = size + len(body)
+            if self._size > self.max_bytes:
+                self.evict()
+
+    def entries(self) -> list[Path]:
+        return [p for p in self.directory.glob("*/*") if p.suffix != ".tmp"]
+
+    def size(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.entries())
+        return self._size
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in `max_bytes`"""
+        entries = sorted(
+            ((p, p.stat()) for p in self.entries()), key=lambda e: e[1].st_mtime
+        )
+        size = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= stat.st_size
+        self._size = size
+
+
+graphql_cache = ResponseCache(
+    f"{CACHE.DIRECTORY}/graphql", max_bytes=CACHE.MAX_BYTES, bypass=CACHE.BYPASS
+)
+
+eth_call_cache = ResponseCache(
+    f"{CACHE.DIRECTORY}/eth_call", max_bytes=CACHE.MAX_BYTES, bypass=CACHE.BYPASS
+)
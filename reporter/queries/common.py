@@ -1,14 +1,28 @@
-from copy import deepcopy
-from typing import Any, TypedDict, TypeVar, cast
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    TypedDict,
+    TypeVar,
+)
+from urllib.parse import urlparse
 
-import requests
-from web3 import Web3
-
-from reporter.env import RPC_URL, SUBGRAPHS
-from reporter.errors import EmptyQueryError, TooManyLoopsError
+from reporter.env import GRAPHQL, SUBGRAPHS
+from reporter.errors import PaginationStalledError, TooManyLoopsError
 from reporter.models import GraphQL_Response, Config, EthereumAddress
-
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+from reporter.queries.abi import RawCall
+from reporter.queries.cache import graphql_cache
+from reporter.queries.decoder import compile_access_path
+from reporter.queries.rpc import get_w3, multicall, multicall_raw
+from reporter.queries.telemetry import in_context, network_telemetry
+from reporter.queries.transport import default_transport, primary
 
 
 class GraphQLConfig(TypedDict):
@@ -36,15 +50,271 @@ def extract_nested_graphql(res: GraphQL_Response, access_path: list[str]):
     :param `access_path`: in the format ['first_key', 'nested_key_level0', 'nested_key_level1', ....]
     :param `res`: api response from graphql. First key should be 'data'
     """
-    deepcopy_access_path = deepcopy(access_path)
     current = res["data"]
-    while len(deepcopy_access_path) > 0:
-        current = current[deepcopy_access_path.pop(0)]
+    for key in access_path:
+        current = current[key]
     return current
 
 
+class Pagination(str, Enum):
+    """
+    :state SKIP: page with `skip += len(batch)`. Slows down with every page and is capped by `max_loops`
+    :state CURSOR: keyset pages with `where: {<field>_gt: $cursor}` ordered by the cursor field.
+    Every page costs the same and there is no loop cap.
+    """
+
+    SKIP = "skip"
+    CURSOR = "cursor"
+
+
+# variables overriding the query's own to restrict it to one range of the keyspace
+Shard = dict[str, Any]
+
+
+def address_shards(count: int = GRAPHQL.SHARDS) -> tuple[Shard, ...]:
+    """
+    Split addresses into `$prefix` ranges (0x0, 0x1 ... 0xf), for queries filtering with `_starts_with: $prefix`
+    :param `count`: rounded down to a power of 16, one or fewer gives a single shard matching every address
+    """
+    digits = 0
+    while 16 ** (digits + 1) <= count:
+        digits += 1
+    if digits == 0:
+        return ({"prefix": "0x"},)
+    return tuple({"prefix": f"0x{i:0{digits}x}"} for i in range(16**digits))
+
+
+def time_shards(
+    start: int, end: int, lower: str, upper: str, count: int = GRAPHQL.SHARDS
+) -> tuple[Shard, ...]:
+    """
+    Split the window `start` - `end` into `count` consecutive windows
+    :param `lower`: the variable holding the start of each window
+    :param `upper`: the variable holding the end of each window
+    """
+    count = max(1, min(count, end - start))
+    bounds = [start + (end - start) * i // count for i in range(count + 1)]
+    return tuple({lower: lo, upper: hi} for lo, hi in zip(bounds, bounds[1:]))
+
+
+class GraphQLQuery(NamedTuple):
+    """
+    A fully specified paginated query, run by `run_query` or `stream_query`
+    :param `url`: the subgraph endpoint
+    :param `access_path`: eg ['erc20accounts', 'balances'] - set of keys to fetch data
+    :param `params`: GraphQL config such as the actual query and variables
+    :param `pagination`: how to move between pages
+    :param `cursor_field`: field holding the cursor, if paginating with `CURSOR`
+    :param `cacheable`: the result can never change (pinned to a block or bounded in the past)
+    :param `shards`: if set, each shard is paged through concurrently, see `graphql_iterate_sharded`
+    :param `name`: the logical query, for network telemetry. Defaults to the endpoint and access path
+    :param `pages_per_request`: pages fetched in each round trip with `CURSOR` pagination, see `alias_pages`
+    """
+
+    url: str
+    access_path: list[str]
+    params: GraphQLConfig
+    pagination: Pagination = Pagination.SKIP
+    cursor_field: str = "id"
+    cacheable: bool = False
+    shards: tuple[Shard, ...] = ()
+    name: str = ""
+    pages_per_request: int = GRAPHQL.PAGES_PER_REQUEST
+
+
+def query_name(url: str, access_path: list[str]) -> str:
+    """Name queries without one after the endpoint and the path to their results"""
+    parsed = urlparse(primary(url))
+    return f"{parsed.netloc}{parsed.path}:{'.'.join(access_path)}"
+
+
+def parse_graphql(
+    url: str, body: bytes, access_path: list[str], aliases: int = 0
+) -> list[T]:
+    """
+    Decode a GraphQL response body and extract the results at `access_path`
+    Only the target is decoded, see `GraphQLDecoder`. Raises if the response is empty or contains errors
+    :param `aliases`: if the target was requested as aliased pages `p0, p1...`, how many to concatenate
+    """
+    if not aliases:
+        return compile_access_path(tuple(access_path)).decode(url, body)
+
+    parent = compile_access_path(tuple(access_path[:-1])).decode(url, body)
+    return [row for i in range(aliases) for row in parent[f"p{i}"]]
+
+
+def post_graphql(
+    url: str,
+    params: GraphQLConfig,
+    access_path: list[str],
+    cacheable: bool = False,
+    aliases: int = 0,
+) -> list[T]:
+    """
+    Send a single GraphQL request and extract the results at `access_path`
+    Cacheable responses are read from the on-disk cache when present, and stored once they parse without errors.
+    """
+    key = graphql_cache.key(url, params["query"], params.get("variables"))
+    cached = graphql_cache.get(key) if cacheable else None
+
+    body = (
+        cached
+        if cached is not None
+        else default_transport.post(url, params, hedge=cacheable)
+    )
+    results: list[T] = parse_graphql(url, body, access_path, aliases)
+    network_telemetry.record(pages=1)
+
+    if cacheable and cached is None:
+        graphql_cache.set(key, body)
+    return results
+
+
+def closing(text: str, start: int) -> int:
+    """Index just past the bracket closing the one at `start`"""
+    opening, close = text[start], {"(": ")", "{": "}"}[text[start]]
+    depth = 0
+    for i in range(start, len(text)):
+        depth += {opening: 1, close: -1}.get(text[i], 0)
+        if depth == 0:
+            return i + 1
+    raise ValueError(f"Unbalanced {opening} in query")
+
+
+def field_arguments(query: str, field: str) -> Optional[tuple[int, int]]:
+    """The span of the arguments of `field` in `query`, None if it has none"""
+    match = re.search(rf"\b{field}\s*\(", query)
+    if match is None:
+        return None
+    return match.end(), closing(query, match.end() - 1) - 1
+
+
+def page_size(query: str, field: str) -> Optional[int]:
+    """Rows requested by the `first` argument of `field`, None if not set in the query"""
+    span = field_arguments(query, field)
+    first = (
+        re.search(r"\bfirst\s*:\s*(\d+)", query[span[0] : span[1]]) if span else None
+    )
+    return int(first.group(1)) if first else None
+
+
+def alias_pages(query: str, field: str, pages: int) -> tuple[str, int]:
+    """
+    Rewrite `query` to request `pages` consecutive windows of `field` in one round trip, using aliases:
+    `p0: field(..., skip: 0) p1: field(..., skip: 1000) ...`
+    Meant for cursor queries, where every request starts from the cursor so the skips stay small.
+    :returns: the new query and the number of rows requested across all windows
+    """
+    span = field_arguments(query, field)
+    if span is None:
+        raise ValueError(f"Cannot alias {field}, it has no arguments in the query")
+
+    args_start, args_end = span
+    field_start = query.rindex(field, 0, args_start)
+    selection_end = closing(query, query.index("{", args_end))
+    args = query[args_start:args_end]
+    selection = query[args_end + 1 : selection_end]
+
+    size = page_size(query, field) or 100  # the graph's default
+    windows = " ".join(
+        f"p{i}: {field}({args} skip: {i * size}){selection}" for i in range(pages)
+    )
+    return query[:field_start] + windows + query[selection_end:], pages * size
+
+
+def aliased_request(
+    params: GraphQLConfig,
+    access_path: list[str],
+    pagination: Pagination,
+    pages_per_request: int,
+) -> tuple[GraphQLConfig, int, Optional[int]]:
+    """
+    Apply `alias_pages` to cursor queries fetching more than one page per request
+    :returns: the params to send, sharing the original variables, the number of aliases and rows requested
+    """
+    if pagination != Pagination.CURSOR:
+        return params, 0, None
+    if pages_per_request <= 1:
+        return params, 0, page_size(params["query"], access_path[-1])
+
+    query, window = alias_pages(params["query"], access_path[-1], pages_per_request)
+    return dict(query=query, variables=params["variables"]), pages_per_request, window
+
+
+class Paginator:
+    """
+    Tracks a paginated query: the variables to send for the next page and when to stop.
+    Shared by the query runners so every runner pages in exactly the same way.
+
+    Cursor pages are de-duplicated on `id`, so the cursor may also be a non-unique field queried with
+    an inclusive filter (eg: snapshot's `created_gte`), where rows sharing the boundary value
+    are returned again on the next page. We stop once a page contains nothing new.
+    If a full page contains nothing new, every row in it shares the cursor value and the cursor
+    can't move past them, so `PaginationStalledError` is raised rather than dropping the rest.
+
+    Fields only needed once, such as contract metadata, can be wrapped in `@include(if: $firstPage)`,
+    the variable is switched off after the first page.
+    :param `window`: rows requested per page, if known. A shorter page means there is nothing left to fetch
+    """
+
+    def __init__(
+        self,
+        params: GraphQLConfig,
+        max_loops: int = 10,
+        pagination: Pagination = Pagination.SKIP,
+        cursor_field: str = "id",
+        window: Optional[int] = None,
+    ):
+        self.params = params
+        self.max_loops = max_loops
+        self.pagination = pagination
+        self.cursor_field = cursor_field
+        self.window = window
+        self.pages = 0
+        self.done = False
+        self.seen: set[str] = set()
+
+    def add(self, batch: list[Any]) -> list[Any]:
+        """Record a page of results, returning the rows not seen before"""
+        variables = self.params["variables"]
+
+        if self.pagination == Pagination.CURSOR:
+            new_results = [r for r in batch if r["id"] not in self.seen]
+            if len(new_results) > 0:
+                self.seen.update(r["id"] for r in new_results)
+                variables["cursor"] = batch[-1][self.cursor_field]
+            elif self.window is not None and len(batch) >= self.window:
+                raise PaginationStalledError(
+                    f"{len(batch)} rows share {self.cursor_field} {variables['cursor']}, "
+                    "more than a page: the rows after them can't be reached"
+                )
+        else:
+            new_results = batch
+            if len(new_results) > 0:
+                if self.pages > self.max_loops:
+                    raise TooManyLoopsError("graphql_iterate_query")
+                variables["skip"] += len(batch)
+
+        if "firstPage" in variables:
+            variables["firstPage"] = False
+
+        self.pages += 1
+        self.done = len(new_results) == 0 or (
+            self.window is not None and len(batch) < self.window
+        )
+        return new_results
+
+
 def graphql_iterate_query(
-    url: str, access_path: list[str], params: GraphQLConfig, max_loops: int = 10
+    url: str,
+    access_path: list[str],
+    params: GraphQLConfig,
+    max_loops: int = 10,
+    pagination: Pagination = Pagination.SKIP,
+    cursor_field: str = "id",
+    cacheable: bool = False,
+    name: str = "",
+    pages_per_request: int = 1,
 ) -> list[T]:
     """
     The graph allows fetching of Max 1000 results for subgraphs.
@@ -52,61 +322,220 @@ def graphql_iterate_query(
     :param `url`: the subgraph endpoint
     :param `access_path`: eg ['erc20accounts', 'balances'] - set of keys to fetch data
     :param `params`: GraphQL config such as the actual query and variables
-    :param `max_loops`: revert if we are looping too many times, can be overridden
+    :param `max_loops`: revert if we are looping too many times, can be overridden. Ignored by cursor pagination.
+    :param `pagination`: `SKIP` expects a `$skip` variable, `CURSOR` expects a `$cursor` variable
+    :param `cursor_field`: the field the query orders by, the last value of each page becomes the next `$cursor`
+    :param `cacheable`: serve pages from the on-disk cache, only for queries whose results can't change
+    :param `name`: the logical query, for network telemetry. Defaults to the endpoint and access path
+    :param `pages_per_request`: with `CURSOR` pagination, fetch this many pages in each round trip using aliases
+    """
+    request, aliases, window = aliased_request(
+        params, access_path, pagination, pages_per_request
+    )
+    pages = Paginator(params, max_loops, pagination, cursor_field, window)
+    all_results: list[T] = []
+    with network_telemetry.measure(name or query_name(url, access_path)):
+        while not pages.done:
+            batch: list[T] = post_graphql(url, request, access_path, cacheable, aliases)
+            all_results += pages.add(batch)
+    return all_results
+
+
+def graphql_iterate_pages(
+    url: str,
+    access_path: list[str],
+    params: GraphQLConfig,
+    max_loops: int = 10,
+    pagination: Pagination = Pagination.SKIP,
+    cursor_field: str = "id",
+    cacheable: bool = False,
+    name: str = "",
+    pages_per_request: int = 1,
+) -> Iterator[list[T]]:
     """
+    Generator counterpart of `graphql_iterate_query`, yielding each page of new results as it arrives.
+    The request for the next page is sent before the current one is yielded, so the round trip
+    overlaps whatever the caller does with the page, and only one page of raw JSON is held at a time.
+    Takes the same arguments as `graphql_iterate_query`.
+    """
+
+    request, aliases, window = aliased_request(
+        params, access_path, pagination, pages_per_request
+    )
+
+    def fetch() -> list[T]:
+        # only time spent waiting on the network is measured, not the caller's work between pages
+        with network_telemetry.measure(name or query_name(url, access_path)):
+            return post_graphql(url, request, access_path, cacheable, aliases)
 
-    response: GraphQL_Response = requests.post(url, json=params).json()
+    pages = Paginator(params, max_loops, pagination, cursor_field, window)
+    # pages are fetched one at a time, so the worker can keep re-entering the caller's context
+    fetch_in_context = in_context(fetch)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_page = executor.submit(fetch_in_context)
+        while not pages.done:
+            batch = pages.add(next_page.result())
+            if not pages.done:
+                # variables for the next page are set by `add`, so it can be requested straight away
+                next_page = executor.submit(fetch_in_context)
+            if batch:
+                yield batch
 
-    if not response:
-        raise EmptyQueryError(f"No results for graph query to {url}")
-    if "errors" in response:
-        raise EmptyQueryError(
-            f"Error in graph query to {url}: {cast(dict, response)['errors']}"
+
+def with_shard(params: GraphQLConfig, shard: Shard) -> GraphQLConfig:
+    """A copy of `params` restricted to `shard`, so shards can page independently"""
+    return dict(query=params["query"], variables={**params["variables"], **shard})
+
+
+def merge_shards(batches: Iterable[list[T]]) -> list[T]:
+    """Concatenate shard results in shard order, keeping the first of any rows sharing an `id`"""
+    seen: set[str] = set()
+    merged: list[T] = []
+    for batch in batches:
+        for row in batch:
+            if row["id"] not in seen:  # type: ignore
+                seen.add(row["id"])  # type: ignore
+                merged.append(row)
+    return merged
+
+
+def graphql_iterate_sharded(
+    url: str,
+    access_path: list[str],
+    params: GraphQLConfig,
+    shards: Iterable[Shard],
+    max_loops: int = 10,
+    pagination: Pagination = Pagination.SKIP,
+    cursor_field: str = "id",
+    cacheable: bool = False,
+    name: str = "",
+    pages_per_request: int = 1,
+    concurrency: Optional[int] = None,
+) -> list[T]:
+    """
+    Split a query across ranges of its keyspace and page through each range at the same time.
+    Fetch time then scales with the largest shard rather than the whole result set.
+    Results are merged in shard order and de-duplicated on `id`, so the output is stable between runs.
+    Other arguments are as `graphql_iterate_query`.
+    :param `shards`: variables applied on top of `params` for each range, eg: `address_shards()`
+    :param `concurrency`: maximum shards in flight, `GRAPHQL.CONCURRENCY` by default
+    """
+
+    def fetch(shard: Shard) -> list[T]:
+        return graphql_iterate_query(
+            url,
+            access_path,
+            with_shard(params, shard),
+            max_loops=max_loops,
+            pagination=pagination,
+            cursor_field=cursor_field,
+            cacheable=cacheable,
+            pages_per_request=pages_per_request,
         )
 
-    all_results: list[T] = extract_nested_graphql(response, access_path)
-
-    current_batch = all_results
-    loops = 0
-    while len(current_batch) > 0:
-        if loops > max_loops:
-            raise TooManyLoopsError("graphql_iterate_query")
-        params["variables"]["skip"] += len(current_batch)
-        response = requests.post(url, json=params).json()
-        current_batch = extract_nested_graphql(response, access_path)
-        all_results += current_batch
-        loops += 1
-    return all_results
+    with network_telemetry.measure(name or query_name(url, access_path)):
+        # shards run in copies of this context, so their requests count towards this query
+        shards = list(shards)
+        contexts = [copy_context() for _ in shards]
+        with ThreadPoolExecutor(
+            max_workers=concurrency or GRAPHQL.CONCURRENCY
+        ) as executor:
+            return merge_shards(
+                executor.map(lambda c, s: c.run(fetch, s), contexts, shards)
+            )
 
 
-def get_token_hodlers(conf: Config, token_address: EthereumAddress) -> list:
+def run_query(query: GraphQLQuery) -> list:
+    if query.shards:
+        return graphql_iterate_sharded(
+            query.url,
+            query.access_path,
+            query.params,
+            query.shards,
+            pagination=query.pagination,
+            cursor_field=query.cursor_field,
+            cacheable=query.cacheable,
+            name=query.name,
+            pages_per_request=query.pages_per_request,
+        )
+    return graphql_iterate_query(
+        query.url,
+        query.access_path,
+        query.params,
+        pagination=query.pagination,
+        cursor_field=query.cursor_field,
+        cacheable=query.cacheable,
+        name=query.name,
+        pages_per_request=query.pages_per_request,
+    )
+
+
+def stream_query(query: GraphQLQuery) -> Iterator[Any]:
     """
-    Fetch holders along with total balances grom the graph.
-    This can be used for Auxo, ARV and PRV but bear in mind that:
-    - ARV balances are subject to decay (for the purposes of rewards)
-    - PRV balances may be deposited into the RollStaker
+    Lazily yield the rows of `query`, fetching the next page while the current one is consumed
+    Sharded queries are fetched concurrently instead, then yielded once merged.
+    """
+    if query.shards:
+        yield from run_query(query)
+        return
+
+    page: list[Any]
+    for page in graphql_iterate_pages(
+        query.url,
+        query.access_path,
+        query.params,
+        pagination=query.pagination,
+        cursor_field=query.cursor_field,
+        cacheable=query.cacheable,
+        name=query.name,
+        pages_per_request=query.pages_per_request,
+    ):
+        yield from page
+
+
+def run_concurrently(*jobs: Callable[[], Any]) -> list[Any]:
     """
+    Run independent fetches at the same time and return their results in the order passed.
+    Wall-clock time is then set by the slowest job instead of the sum of all of them.
+
+    Jobs are blocking callables (bind arguments with `functools.partial` or a lambda), each run in a worker thread
+    and in a copy of this context, so their requests count towards any open query.
+    """
+    with ThreadPoolExecutor(max_workers=max(len(jobs), 1)) as executor:
+        futures = [executor.submit(in_context(job)) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def token_hodlers_query(conf: Config, token_address: EthereumAddress) -> GraphQLQuery:
+    """Query for every holder of `token_address` at the snapshot block"""
     query = """
-        query($token: String, $block: Int, $skip: Int) {
+        query($token: String, $block: Int, $cursor: String, $prefix: String, $firstPage: Boolean!) {
             erc20Contract(
                 id: $token,
                 block: {number: $block}
             ) {
-                decimals
-                id
-                name
-                symbol      
-                totalSupply {
-                    value
-                    valueExact
+                ... @include(if: $firstPage) {
+                    decimals
+                    id
+                    name
+                    symbol
+                    totalSupply {
+                        value
+                        valueExact
+                    }
                 }
                 balances(
-                    orderBy: valueExact
-                    orderDirection: desc
-                    where: {account_not: null, valueExact_gt: 0}
+                    orderBy: id
+                    orderDirection: asc
+                    where: {
+                        account_not: null,
+                        account_starts_with: $prefix,
+                        valueExact_gt: 0,
+                        id_gt: $cursor
+                    }
                     first: 1000
-                    skip: $skip
                 ) {
+                    id
                     account {
                         id
                     }
@@ -119,11 +548,40 @@ def get_token_hodlers(conf: Config, token_address: EthereumAddress) -> list:
     variables = {
         "token": token_address,
         "block": conf.block_snapshot,
-        "skip": 0,
+        "cursor": "",
+        "prefix": "0x",
+        "firstPage": True,
     }
 
-    return graphql_iterate_query(
+    return GraphQLQuery(
         SUBGRAPHS.AUXO_STAKING,
         ["erc20Contract", "balances"],
         dict(query=query, variables=variables),
+        pagination=Pagination.CURSOR,
+        cacheable=True,
+        shards=address_shards(),
+        name=f"token_hodlers:{token_address}",
     )
+
+
+def sort_by_balance(holders: list[Any]) -> list[Any]:
+    """cursor pages come back ordered by id, keep the largest holders first as before"""
+    return sorted(holders, key=lambda h: int(h["valueExact"]), reverse=True)
+
+
+def stream_token_hodlers(conf: Config, token_address: EthereumAddress) -> Iterator[Any]:
+    """
+    Lazily yield holders, ordered by balance id rather than balance.
+    Use this to process holders without first building the full list.
+    """
+    return stream_query(token_hodlers_query(conf, token_address))
+
+
+def get_token_hodlers(conf: Config, token_address: EthereumAddress) -> list:
+    """
+    Fetch holders along with total balances grom the graph.
+    This can be used for Auxo, ARV and PRV but bear in mind that:
+    - ARV balances are subject to decay (for the purposes of rewards)
+    - PRV balances may be deposited into the RollStaker
+    """
+    return sort_by_balance(list(stream_token_hodlers(conf, token_address)))
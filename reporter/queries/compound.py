@@ -1,8 +1,10 @@
-from reporter.env import ADDRESSES
+from enum import Enum
+
+from reporter.env import ADDRESSES, COMPOUND
 from reporter.models.Config import CompoundConf
 from reporter.models.ERC20 import AUXO_TOKEN_NAMES
-from reporter.queries import w3
-from multicall import Call, Multicall  # type: ignore
+from reporter.queries import RawCall, multicall_raw
+from reporter.queries.rpc import engine_settings
 from reporter.models import (
     MerkleRecipient,
     MerkleTree,
@@ -10,34 +12,52 @@ from reporter.models import (
     EthereumAddress,
 )
 
+"""
+Only a small share of merkle tree recipients delegate their claims to the ops multisig,
+so by default delegation is resolved first, and `isClaimed` is only checked for the delegators.
+Trees small enough to fit both checks in a single multicall batch are read in one pass.
+"""
+
+
+class CompoundScan(str, Enum):
+    """
+    :state TWO_PHASE: check delegation for all recipients, then `isClaimed` for delegators only
+    :state SINGLE_PASS: check both for every recipient, interleaved in the same multicall batches
+    :state AUTO: single pass if both checks fit in one multicall batch, otherwise two phase
+    """
+
+    TWO_PHASE = "two_phase"
+    SINGLE_PASS = "single_pass"
+    AUTO = "auto"
+
 
 MulticallIsRewardsCompounder = dict[EthereumAddress, bool]
 
 
+def is_compounder(distributor: EthereumAddress) -> RawCall:
+    # function isRewardsDelegate(address _user, address _delegate) public view returns (bool)
+    return RawCall(distributor, "isRewardsDelegate(address,address)(bool)")
+
+
+def is_claimed(distributor: EthereumAddress) -> RawCall:
+    # function isClaimed(uint256 _windowIndex, uint256 _accountIndex) public view returns (bool) {
+    return RawCall(distributor, "isClaimed(uint256,uint256)(bool)")
+
+
 def multicall_is_compounder(
     recipients: RecipientMerkleClaim,
     distributor: EthereumAddress,
     block_number: int,
 ) -> MulticallIsRewardsCompounder:
 
-    calls = [
-        Call(
-            # address to call:
-            distributor,
-            # function isRewardsDelegate(address _user, address _delegate) public view returns (bool)
-            [
-                "isRewardsDelegate(address,address)(bool)",
-                address,
-                ADDRESSES.MULTISIG_OPS,
-            ],
-            # return in a format of {[address]: bool}:
-            [[address, None]],
-        )
+    call = is_compounder(distributor)
+    reads = [
+        (address, call, (address, ADDRESSES.MULTISIG_OPS))
         for address in recipients.keys()
     ]
 
-    # Immediately execute the multicall
-    return Multicall(calls, _w3=w3, block_id=block_number)()
+    # Immediately execute the multicall, in the format of {[address]: bool}
+    return multicall_raw(reads, block_number, name="compound_is_compounder")
 
 
 MulticallIsRewardsClaimed = dict[EthereumAddress, bool]
@@ -49,24 +69,56 @@ def multicall_is_claimed(
     block_number: int,
 ) -> MulticallIsRewardsCompounder:
 
-    calls = [
-        Call(
-            # address to call:
-            distributor,
-            # function isClaimed(uint256 _windowIndex, uint256 _accountIndex) public view returns (bool) {
-            [
-                "isClaimed(uint256,uint256)(bool)",
-                recipient.windowIndex,
-                recipient.accountIndex,
-            ],
-            # return in a format of {[address]: bool}:
-            [[address, None]],
-        )
+    call = is_claimed(distributor)
+    reads = [
+        (address, call, (recipient.windowIndex, recipient.accountIndex))
         for address, recipient in recipients.items()
     ]
 
-    # Immediately execute the multicall
-    return Multicall(calls, _w3=w3, block_id=block_number)()
+    # Immediately execute the multicall, in the format of {[address]: bool}
+    return multicall_raw(reads, block_number, name="compound_is_claimed")
+
+
+def multicall_is_compounder_and_claimed(
+    recipients: RecipientMerkleClaim,
+    distributor: EthereumAddress,
+    block_number: int,
+) -> tuple[MulticallIsRewardsCompounder, MulticallIsRewardsClaimed]:
+    """
+    Check delegation and claims of every recipient in a single pass, both calls for a recipient side by side
+    :returns: the same dictionaries as `multicall_is_compounder` and `multicall_is_claimed`
+    """
+
+    delegate, claimed_call = is_compounder(distributor), is_claimed(distributor)
+    reads = [
+        read
+        for address, recipient in recipients.items()
+        for read in (
+            (("delegated", address), delegate, (address, ADDRESSES.MULTISIG_OPS)),
+            (
+                ("claimed", address),
+                claimed_call,
+                (recipient.windowIndex, recipient.accountIndex),
+            ),
+        )
+    ]
+
+    results = multicall_raw(
+        reads, block_number, name="compound_is_compounder_and_claimed"
+    )
+    delegated = {address: results[("delegated", address)] for address in recipients}
+    claimed = {address: results[("claimed", address)] for address in recipients}
+    return delegated, claimed
+
+
+def compound_scan(recipients: RecipientMerkleClaim, scan: CompoundScan) -> CompoundScan:
+    """Resolve `AUTO` for a tree of `recipients`, against the batch size of the run's multicall engine"""
+    if scan != CompoundScan.AUTO:
+        return scan
+    _, batch_size, _ = engine_settings(None, None, None)
+    if 2 * len(recipients) <= batch_size:
+        return CompoundScan.SINGLE_PASS
+    return CompoundScan.TWO_PHASE
 
 
 def delegated_and_unclaimed(
@@ -84,8 +136,21 @@ def get_unclaimed_delegated_recipients(
 ) -> RecipientMerkleClaim:
     distributor = conf.distributor(token)
     block = conf.block_snapshot
-    delegated = multicall_is_compounder(tree.recipients, distributor, block)
-    claimed = multicall_is_claimed(tree.recipients, distributor, block)
+    scan = compound_scan(tree.recipients, CompoundScan(COMPOUND.SCAN))
+
+    if scan == CompoundScan.SINGLE_PASS:
+        delegated, claimed = multicall_is_compounder_and_claimed(
+            tree.recipients, distributor, block
+        )
+    else:
+        delegated = multicall_is_compounder(tree.recipients, distributor, block)
+        delegators = {
+            address: tree.recipients[address]
+            for address, is_delegated in delegated.items()
+            if is_delegated
+        }
+        claimed = multicall_is_claimed(delegators, distributor, block)
+
     delegated_but_unclaimed = delegated_and_unclaimed(delegated, claimed)
     return {
         recipient: MerkleRecipient.parse_obj(tree.recipients[recipient])
@@ -0,0 +1,131 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Optional, Union
+
+from reporter.errors import EmptyQueryError
+
+"""
+GraphQL pages can be large, and most of a response is wrapping we don't need:
+holder pages repeat the token metadata and total supply on every request.
+Rather than building the whole document and walking it, we walk the raw text
+down the access path and only decode the array we are after.
+"""
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+STRUCTURE = re.compile(r'["{}\[\]]')
+SCALAR = re.compile(r"[^,}\]\s]+")
+
+
+class GraphQLDecoder:
+    """
+    Decodes only the value at `access_path` (below `data`) from a GraphQL response body.
+    Values off the path are skipped over in the raw text and never built.
+    :param `access_path`: in the format ['first_key', 'nested_key_level0', 'nested_key_level1', ....]
+    """
+
+    def __init__(self, access_path: tuple[str, ...]):
+        self.access_path = access_path
+        self._json = json.JSONDecoder()
+
+    def decode(self, url: str, body: Union[bytes, str]) -> Any:
+        """
+        Extract the results at `access_path`
+        Raises if the response is empty or contains errors, and `KeyError` if the path is missing
+        """
+        text = body.decode() if isinstance(body, bytes) else body
+        idx = self._whitespace(text, 0)
+        if not text.startswith("{", idx):
+            raise EmptyQueryError(f"No results for graph query to {url}")
+
+        # the spec allows `errors` either side of `data`, so every top level member is visited
+        value, missing, errors = None, None, None
+        next_member = self._first_member(text, idx)
+        while next_member is not None:
+            key, idx = self._member(text, next_member)
+            if key == "errors":
+                errors, end = self._json.raw_decode(text, idx)
+            elif key == "data" and not text.startswith("null", idx):
+                try:
+                    value, end = self._extract(text, idx)
+                except KeyError as e:
+                    missing, end = e, self._skip(text, idx)
+            else:
+                end = self._skip(text, idx)
+            next_member = self._next_member(text, end)
+
+        if errors is not None:
+            raise EmptyQueryError(f"Error in graph query to {url}: {errors}")
+        if missing is not None:
+            raise missing
+        if value is None:
+            raise EmptyQueryError(f"No results for graph query to {url}")
+        return value
+
+    def _extract(self, text: str, idx: int) -> tuple[Any, int]:
+        """Decode the target below the `data` object at `idx`, returning it with the index past `data`"""
+        for key in self.access_path:
+            idx = self._find(text, idx, key)
+        value, end = self._json.raw_decode(text, idx)
+        # close every object opened on the way down without looking at the members that follow
+        return value, self._close(text, end, depth=len(self.access_path))
+
+    def _find(self, text: str, idx: int, key: str) -> int:
+        """Index of the value for `key` in the object starting at `idx`"""
+        next_member = self._first_member(text, idx) if text[idx] == "{" else None
+        while next_member is not None:
+            member, idx = self._member(text, next_member)
+            if member == key:
+                return idx
+            next_member = self._next_member(text, self._skip(text, idx))
+        raise KeyError(key)
+
+    def _first_member(self, text: str, idx: int) -> Optional[int]:
+        """Index of the first key in the object opening at `idx`, if it has any"""
+        idx = self._whitespace(text, idx + 1)
+        return None if text[idx] == "}" else idx
+
+    def _member(self, text: str, idx: int) -> tuple[str, int]:
+        """Decode the key at `idx`, returning it with the index of its value"""
+        key, idx = self._json.raw_decode(text, idx)
+        idx = self._whitespace(text, idx)
+        return key, self._whitespace(text, idx + 1)  # past the ':'
+
+    def _next_member(self, text: str, idx: int) -> Optional[int]:
+        """Index of the next key after the value ending at `idx`, or `None` once the object closes"""
+        idx = self._whitespace(text, idx)
+        return None if text[idx] == "}" else self._whitespace(text, idx + 1)
+
+    def _skip(self, text: str, idx: int) -> int:
+        """Index just past the value starting at `idx`"""
+        char = text[idx]
+        if char == '"':
+            return STRING.match(text, idx).end()  # type: ignore
+        if char in "{[":
+            return self._close(text, idx + 1, depth=1)
+        return SCALAR.match(text, idx).end()  # type: ignore
+
+    def _close(self, text: str, pos: int, depth: int) -> int:
+        """Index just past the point where `depth` currently open objects or arrays have closed"""
+        start = pos
+        while depth > 0:
+            match = STRUCTURE.search(text, pos)
+            if match is None:
+                raise json.JSONDecodeError("Unterminated value", text, start)
+            if match.group() == '"':
+                pos = STRING.match(text, match.start()).end()  # type: ignore
+                continue
+            depth += 1 if match.group() in "{[" else -1
+            pos = match.end()
+        return pos
+
+    @staticmethod
+    def _whitespace(text: str, idx: int) -> int:
+        return WHITESPACE.match(text, idx).end()  # type: ignore
+
+
+@lru_cache(maxsize=None)
+def compile_access_path(access_path: tuple[str, ...]) -> GraphQLDecoder:
+    """Decoders are reused for every page of every query sharing an access path"""
+    return GraphQLDecoder(access_path)
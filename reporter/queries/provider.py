@@ -0,0 +1,120 @@
+import json
+from typing import Any, Optional, cast
+
+from hexbytes import HexBytes
+from web3.providers import HTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from reporter.queries.cache import ResponseCache, eth_call_cache
+from reporter.queries.transport import default_transport
+
+"""
+The web3 provider behind `reporter.queries.rpc.get_w3`.
+It lives in its own module, as importing web3 is only worth paying for once a contract is read.
+"""
+
+
+class TransportHTTPProvider(HTTPProvider):
+    """JSON-RPC over `default_transport`, with eth_calls at a block number served from `eth_call_cache`"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._chain_id: Optional[int] = None
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        key = self.eth_call_key(method, params)
+        cached = eth_call_cache.get(key) if key else None
+        if cached is not None:
+            return RPCResponse({"jsonrpc": "2.0", "result": cached.decode()})
+
+        # a block-pinned read returns the same result from every node, so it is safe to hedge
+        response = self.send(method, params, hedge=key is not None)
+        if key and "result" in response and "error" not in response:
+            eth_call_cache.set(key, response["result"].encode())
+        return response
+
+    def send(
+        self, method: RPCEndpoint, params: Any, hedge: bool = False
+    ) -> RPCResponse:
+        """`endpoint_uri` may be a comma-separated list of nodes, see `EndpointPool`"""
+        request = self.encode_rpc_request(method, params)
+        return self.decode_rpc_response(
+            default_transport.post(str(self.endpoint_uri), request, hedge=hedge)
+        )
+
+    def make_batch_request(
+        self, requests: list[tuple[RPCEndpoint, Any]]
+    ) -> list[RPCResponse]:
+        """
+        Send `requests` together as one JSON-RPC batch array, returning their responses in the same order.
+        Each request is served from and stored in the cache as in `make_request`, only the rest are sent.
+        Raises `ValueError` if the node rejects the batch as a whole, eg: because it is too large.
+        """
+        keys = [self.eth_call_key(method, params) for method, params in requests]
+        responses: list[Optional[RPCResponse]] = []
+        for key in keys:
+            cached = eth_call_cache.get(key) if key else None
+            responses.append(
+                RPCResponse({"jsonrpc": "2.0", "result": cached.decode()})
+                if cached is not None
+                else None
+            )
+
+        missing = [i for i, response in enumerate(responses) if response is None]
+        if missing:
+            batch = [
+                {
+                    "jsonrpc": "2.0",
+                    "method": requests[i][0],
+                    "params": requests[i][1],
+                    "id": i,
+                }
+                for i in missing
+            ]
+            body = default_transport.post(
+                str(self.endpoint_uri),
+                json.dumps(batch).encode(),
+                hedge=all(keys[i] is not None for i in missing),
+            )
+            answers = json.loads(body)
+            if not isinstance(answers, list):
+                raise ValueError(answers.get("error", answers))
+
+            for answer in answers:
+                i = answer["id"]
+                responses[i] = cast(RPCResponse, answer)
+                if keys[i] and "result" in answer and "error" not in answer:
+                    eth_call_cache.set(keys[i], answer["result"].encode())
+
+        answered = [response for response in responses if response is not None]
+        if len(answered) != len(responses):
+            raise ValueError("Batch response is missing some of the requests")
+        return answered
+
+    def chain_id(self) -> int:
+        """Part of every cache key, so results from different networks never mix"""
+        if self._chain_id is None:
+            self._chain_id = int(
+                self.send(RPCEndpoint("eth_chainId"), [])["result"], 16
+            )
+        return self._chain_id
+
+    def eth_call_key(self, method: RPCEndpoint, params: Any) -> Optional[str]:
+        """
+        Cache key of (chainId, block, to, calldata) for an eth_call pinned to a block number.
+        Reads at a tag such as 'latest', or with state overrides, can change and are never cached.
+        """
+        if method != "eth_call" or len(params) != 2:
+            return None
+        transaction, block = params
+        if not isinstance(block, int):
+            # block hashes are hex too, but 32 bytes long
+            if not (
+                isinstance(block, str) and block.startswith("0x") and len(block) < 66
+            ):
+                return None
+            block = int(block, 16)
+
+        to = str(transaction["to"]).lower()
+        data = HexBytes(transaction.get("data", b"")).hex()
+        return ResponseCache.key(self.chain_id(), block, to, data)
@@ -1,6 +1,4 @@
-from typing import Literal
-
-from multicall import Call, Multicall  # type: ignore
+from typing import Literal, Optional
 
 from reporter.env import ADDRESSES
 from reporter.models import (
@@ -10,7 +8,16 @@ from reporter.models import (
     EthereumAddress,
     PRVStaker,
 )
-from reporter.queries.common import SUBGRAPHS, graphql_iterate_query, w3
+from reporter.queries.block_snapshot import SnapshotReader
+from reporter.queries.common import (
+    SUBGRAPHS,
+    GraphQLQuery,
+    Pagination,
+    RawCall,
+    address_shards,
+    multicall_raw,
+    run_query,
+)
 
 """
 We calculate PRV differently to ARV. ARV rewards are distributed to active voters, PRV rewards
@@ -26,16 +33,18 @@ PRVDepositorGraphQLReturn = list[
 ]
 
 
-def get_all_prv_depositors(block: int) -> PRVDepositorGraphQLReturn:
-    """
-    returns a simple list of every user that has a nonzero PRV staked balance in the rollstaker.
-    This will include pending stakes that should not be counted as active
-
-    Therefore, ensure you check the user's active balance (in the current epoch) before assigning rewards.
-    """
+def prv_depositors_query(block: int) -> GraphQLQuery:
+    """Query for every account with a nonzero balance in the rollstaker at `block`"""
     query = """
-    query ($block: Int, $skip: Int) {
-      prvstakingBalances(first: 1000, skip: $skip, block: { number: $block }, where: { value_not: "0" }) {
+    query ($block: Int, $cursor: String, $prefix: String) {
+      prvstakingBalances(
+        first: 1000
+        orderBy: id
+        orderDirection: asc
+        block: { number: $block }
+        where: { value_not: "0", account_starts_with: $prefix, id_gt: $cursor }
+      ) {
+        id
         account {
           id
         }
@@ -45,38 +54,50 @@ def get_all_prv_depositors(block: int) -> PRVDepositorGraphQLReturn:
     }
     """
     # this also needs to be at the block number
-    return graphql_iterate_query(
+    return GraphQLQuery(
         SUBGRAPHS.AUXO_STAKING,
         ["prvstakingBalances"],
-        dict(query=query, variables={"skip": 0, "block": block}),
+        dict(query=query, variables={"cursor": "", "block": block, "prefix": "0x"}),
+        pagination=Pagination.CURSOR,
+        cacheable=True,
+        shards=address_shards(),
+        name="prv_depositors",
     )
 
 
+def get_all_prv_depositors(block: int) -> PRVDepositorGraphQLReturn:
+    """
+    returns a simple list of every user that has a nonzero PRV staked balance in the rollstaker.
+    This will include pending stakes that should not be counted as active
+
+    Therefore, ensure you check the user's active balance (in the current epoch) before assigning rewards.
+    """
+    return run_query(prv_depositors_query(block))
+
+
 def get_prv_staked_balances(
     stakers: list[EthereumAddress],
     conf: Config,
+    reader: Optional[SnapshotReader] = None,
 ) -> dict[EthereumAddress, str]:
     """
     For a given list of stakers, fetch the balance in the current epoch that is earning rewards
+    :param `reader`: if passed, reads queued on it are sent in the same multicall
     """
-    calls = [
-        Call(
-            # address to call:
-            ADDRESSES.PRV_ROLLSTAKER,
-            # signature + return value, with argument:
-            ["getActiveBalanceForUser(address)(uint256)", s],
-            # return in a format of {[address]: uint256}:
-            [[s, None]],
-        )
-        for s in stakers
-    ]
+    active_balance = RawCall(
+        ADDRESSES.PRV_ROLLSTAKER, "getActiveBalanceForUser(address)(uint256)"
+    )
+    reads = [(s, active_balance, (s,)) for s in stakers]
 
-    # Immediately execute the multicall
-    # need to add the block number here
-    return Multicall(calls, _w3=w3, block_id=conf.block_snapshot)()
+    # Immediately execute the multicall, in the format of {[address]: uint256}
+    if reader is not None:
+        return reader.read(reads, name="prv_staked_balances")
+    return multicall_raw(reads, conf.block_snapshot, name="prv_staked_balances")
 
 
-def get_prv_stakers(conf: Config) -> list[PRVStaker]:
+def get_prv_stakers(
+    conf: Config, reader: Optional[SnapshotReader] = None
+) -> list[PRVStaker]:
     """
     Fetch a list of all accounts with deposits in the RollStaker contract
     Then filter to just those with a currently active balance of > 1
@@ -86,7 +107,7 @@ def get_prv_stakers(conf: Config) -> list[PRVStaker]:
         d["account"]["id"] for d in get_all_prv_depositors(conf.block_snapshot)
     ]
 
-    prv_balances = get_prv_staked_balances(all_depositors, conf)
+    prv_balances = get_prv_staked_balances(all_depositors, conf, reader)
 
     return [
         PRVStaker(address=addr, prv_holding=staked)
@@ -113,6 +134,8 @@ def prv_stakers_to_accounts(stakers: list[PRVStaker], conf: Config) -> list[Acco
     ]
 
 
-def get_prv_accounts(conf: Config) -> list[Account]:
-    stakers = get_prv_stakers(conf)
+def get_prv_accounts(
+    conf: Config, reader: Optional[SnapshotReader] = None
+) -> list[Account]:
+    stakers = get_prv_stakers(conf, reader)
     return prv_stakers_to_accounts(stakers, conf)
@@ -0,0 +1,111 @@
+import gzip
+import json
+from contextlib import contextmanager
+from enum import Enum
+from pathlib import Path
+from threading import Lock as _Lock
+from typing import Any, Iterator
+
+from reporter.errors import ReplayMissError
+from reporter.queries.cache import ResponseCache, eth_call_cache, graphql_cache
+from reporter.queries.transport import HTTPTransport, default_transport
+
+"""
+An epoch run depends on the subgraphs, Snapshot and the RPC node. Recording a run saves every
+response it received into a single archive, so the run can later be replayed offline:
+for reruns, audits and benchmarking the pipeline without network time.
+"""
+
+
+class TransportMode(str, Enum):
+    """
+    :state LIVE: requests go to the network
+    :state RECORD: requests go to the network, and every response is saved
+    :state REPLAY: requests are answered from the saved responses, the network is never used
+    """
+
+    LIVE = "live"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+class Recording:
+    """
+    Response bodies keyed on the request that produced them, stored as gzipped JSON
+    :param `path`: the archive, loaded if it exists so several runs of an epoch share one file
+    :param `mode`: `RECORD` or `REPLAY`
+    """
+
+    def __init__(self, path: str, mode: TransportMode):
+        self.path = Path(path)
+        self.mode = mode
+        self.responses: dict[str, str] = {}
+        self._lock = _Lock()
+        if self.path.exists():
+            self.responses = json.loads(gzip.decompress(self.path.read_bytes()))
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == TransportMode.REPLAY
+
+    @staticmethod
+    def key(url: str, body: bytes) -> str:
+        """JSON-RPC ids are a running counter, so they are left out of the key"""
+        request = json.loads(body)
+        if isinstance(request, dict) and "jsonrpc" in request:
+            request = {k: v for k, v in request.items() if k != "id"}
+        return ResponseCache.key(url, request)
+
+    def record(self, url: str, body: bytes, response: bytes) -> None:
+        with self._lock:
+            self.responses[self.key(url, body)] = response.decode()
+
+    def replay(self, url: str, body: bytes) -> bytes:
+        """The saved response to this request, with the JSON-RPC id swapped for the one now expected"""
+        with self._lock:
+            response = self.responses.get(self.key(url, body))
+        if response is None:
+            raise ReplayMissError(f"No recorded response for request to {url}")
+
+        request = json.loads(body)
+        if isinstance(request, dict) and "jsonrpc" in request:
+            decoded: Any = json.loads(response)
+            decoded["id"] = request["id"]
+            return json.dumps(decoded).encode()
+        return response.encode()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            archive = json.dumps(self.responses, sort_keys=True).encode()
+        self.path.write_bytes(gzip.compress(archive))
+
+
+@contextmanager
+def transport_mode(
+    mode: TransportMode, path: str, transport: HTTPTransport = default_transport
+) -> Iterator[None]:
+    """
+    Record or replay all traffic through `transport` inside the block
+    While recording the response caches are bypassed, so responses cached by earlier runs are captured too.
+    :param `path`: the archive for the epoch, eg: `reports/{epoch}/inputs.json.gz`
+    """
+    if mode == TransportMode.LIVE:
+        yield
+        return
+
+    recording = Recording(path, mode)
+    caches = (graphql_cache, eth_call_cache)
+    bypass = [cache.bypass for cache in caches]
+    transport.recording = recording
+    for cache in caches:
+        cache.bypass = cache.bypass or mode == TransportMode.RECORD
+    try:
+        yield
+    finally:
+        transport.recording = None
+        for cache, previous in zip(caches, bypass):
+            cache.bypass = previous
+
+    if mode == TransportMode.RECORD:
+        recording.save()
@@ -0,0 +1,203 @@
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence
+
+from reporter.env import MULTICALL, RPC_URL
+from reporter.errors import TransportError
+from reporter.queries.abi import RawCall, decode_aggregate, encode_aggregate, selector
+from reporter.queries.telemetry import in_context, network_telemetry
+
+if TYPE_CHECKING:
+    from multicall import Call  # type: ignore
+    from web3 import Web3
+
+"""
+Contract reads are sent through the same pooled, retrying transport as the GraphQL queries.
+`Multicall(...)()` builds its own async web3 session behind the scenes, which we can neither
+observe nor retry, so multicalls are executed here as a plain `aggregate` eth_call instead.
+
+A single `aggregate` holding one call per holder goes over the node's gas and response size limits
+once there are a few thousand holders. Calls are therefore sent in batches, several at a time,
+and a batch that times out or reverts is split in half and retried until the failing call is isolated.
+
+An eth_call at a block number returns the same result forever, so those results are cached on disk
+and reruns of an epoch only ask the node for reads it hasn't answered before.
+
+web3 and multicall take most of a second to import, so they are only imported once a contract is read:
+commands that never touch the node, such as creating an epoch folder, start without them.
+
+Some providers limit the size of an `aggregate`, others price JSON-RPC batches cheaply, so the same reads
+can also be sent as plain eth_calls in JSON-RPC batch arrays. `MULTICALL_ENGINE` picks one for the run.
+"""
+
+AGGREGATE_SELECTOR = selector("aggregate((address,bytes)[])")
+
+
+class Engine(str, Enum):
+    """
+    :state AGGREGATE: calls are packed into Multicall3 `aggregate` eth_calls
+    :state BATCH: each call is a plain eth_call, sent in JSON-RPC batch arrays
+    """
+
+    AGGREGATE = "aggregate"
+    BATCH = "batch"
+
+
+@lru_cache(maxsize=None)
+def get_w3() -> "Web3":
+    """The `Web3` instance for `RPC_URL`, built on first use"""
+    from web3 import Web3
+    from reporter.queries.provider import TransportHTTPProvider
+
+    return Web3(TransportHTTPProvider(RPC_URL))
+
+
+def aggregate(requests: list[tuple[str, bytes]], block_id: int) -> list[bytes]:
+    """
+    Execute (target, calldata) `requests` in one `aggregate` eth_call, returning the raw output of each.
+    The call is made on `get_w3()` directly, retries are left to the transport.
+    """
+    w3 = get_w3()
+    data = encode_aggregate(AGGREGATE_SELECTOR, requests)
+    call = {"to": MULTICALL.ADDRESS, "data": data}
+    outputs = decode_aggregate(bytes(w3.eth.call(call, block_id)))
+    network_telemetry.record(pages=1)
+    return outputs
+
+
+def eth_call_batch(requests: list[tuple[str, bytes]], block_id: int) -> list[bytes]:
+    """
+    Execute (target, calldata) `requests` as plain eth_calls in one JSON-RPC batch array, returning the output of each.
+    Raises `ValueError` if any of the calls fails, as `aggregate` would.
+    """
+    block = hex(block_id) if isinstance(block_id, int) else block_id
+    calls = [
+        ("eth_call", [{"to": target, "data": "0x" + data.hex()}, block])
+        for target, data in requests
+    ]
+    responses = get_w3().provider.make_batch_request(calls)  # type: ignore
+    network_telemetry.record(pages=1)
+
+    outputs = []
+    for response in responses:
+        if "error" in response:
+            raise ValueError(response["error"])
+        outputs.append(bytes.fromhex(response["result"][2:]))
+    return outputs
+
+
+ENGINES: dict[Engine, Callable[[list[tuple[str, bytes]], int], list[bytes]]] = {
+    Engine.AGGREGATE: aggregate,
+    Engine.BATCH: eth_call_batch,
+}
+
+
+def send_adaptive(
+    send: Callable[[list[tuple[str, bytes]], int], list[bytes]],
+    requests: list[tuple[str, bytes]],
+    block_id: int,
+) -> list[bytes]:
+    """
+    `send` a batch of requests, halving it whenever it times out or is rejected.
+    A single call that still fails can't be split any further, so its error is raised.
+    """
+    try:
+        return send(requests, block_id)
+    except (TransportError, ValueError):
+        # web3 raises `ValueError` for JSON-RPC errors, including reverts and gas limits
+        if len(requests) == 1:
+            raise
+    half = len(requests) // 2
+    return send_adaptive(send, requests[:half], block_id) + send_adaptive(
+        send, requests[half:], block_id
+    )
+
+
+def engine_settings(
+    engine: Optional[Engine], batch_size: Optional[int], concurrency: Optional[int]
+) -> tuple[Engine, int, int]:
+    """Fill in the run's engine, and its batch size and concurrency, for any left unset"""
+    engine = Engine(engine or MULTICALL.ENGINE)
+    if engine == Engine.BATCH:
+        defaults = (MULTICALL.RPC_BATCH_SIZE, MULTICALL.RPC_CONCURRENCY)
+    else:
+        defaults = (MULTICALL.BATCH_SIZE, MULTICALL.CONCURRENCY)
+    return engine, batch_size or defaults[0], concurrency or defaults[1]
+
+
+def execute(
+    requests: list[tuple[str, bytes]],
+    block_id: int,
+    name: str,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    engine: Optional[Engine] = None,
+) -> list[bytes]:
+    """Run `requests` at `block_id` in concurrent batches, returning the outputs in request order"""
+    engine, batch_size, concurrency = engine_settings(engine, batch_size, concurrency)
+    batches = [
+        requests[i : i + batch_size] for i in range(0, len(requests), batch_size)
+    ]
+    send = ENGINES[engine]
+    with network_telemetry.measure(name):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # each batch runs in its own copy of the context, which carries the open query
+            futures = [
+                executor.submit(
+                    in_context(partial(send_adaptive, send, batch, block_id))
+                )
+                for batch in batches
+            ]
+            return [output for future in futures for output in future.result()]
+
+
+def multicall(
+    calls: list["Call"],
+    block_id: int,
+    name: str,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    engine: Optional[Engine] = None,
+) -> dict[str, Any]:
+    """
+    Execute `calls` at `block_id` in batches of `aggregate` eth_calls and merge their named returns.
+    Returns the same dictionary as `Multicall(calls, _w3=get_w3(), block_id=block_id)()`.
+    :param `name`: the logical query, for network telemetry
+    :param `batch_size`: calls per batch, halved for any batch the node rejects. Defaults to the engine's setting
+    :param `concurrency`: batches in flight at once. Defaults to the engine's setting
+    :param `engine`: how the calls are sent, `MULTICALL_ENGINE` by default
+    """
+    if not calls:
+        return {}
+    from multicall import Call  # type: ignore
+
+    requests = [(call.target, call.data) for call in calls]
+    outputs = execute(requests, block_id, name, batch_size, concurrency, engine)
+
+    results: dict[str, Any] = {}
+    for call, output in zip(calls, outputs):
+        results.update(Call.decode_output(output, call.signature, call.returns))
+    return results
+
+
+def multicall_raw(
+    reads: Sequence[tuple[Any, RawCall, tuple]],
+    block_id: int,
+    name: str,
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    engine: Optional[Engine] = None,
+) -> dict[Any, Any]:
+    """
+    Bulk counterpart of `multicall` for reads of a few known functions, see `RawCall`.
+    :param `reads`: (key, function, arguments) for each read, eg: `(address, balance_of, (address,))`
+    :returns: the decoded result of each read under its key
+    Takes the same keyword arguments as `multicall`.
+    """
+    if not reads:
+        return {}
+
+    requests = [(call.target, call.encode(*args)) for _, call, args in reads]
+    outputs = execute(requests, block_id, name, batch_size, concurrency, engine)
+    return {key: call.decode(output) for (key, call, _), output in zip(reads, outputs)}
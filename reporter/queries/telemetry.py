@@ -0,0 +1,143 @@
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from threading import Lock as _Lock
+from time import perf_counter
+from typing import Callable, Iterator, Optional, TypeVar
+
+from reporter.env import TELEMETRY
+
+"""
+Every request to a subgraph, Snapshot or the RPC node is attributed to the logical query that made it,
+so a slow run can be traced back to the service responsible.
+
+Logical queries are opened with `network_telemetry.measure(name)`. The transport records calls, bytes and retries
+against whichever query is open in the current context, which carries over into worker threads run with `in_context`.
+"""
+
+UNATTRIBUTED = "unattributed"
+
+_T = TypeVar("_T")
+
+
+def in_context(job: Callable[[], _T]) -> Callable[[], _T]:
+    """
+    `job` bound to a copy of the current context, to hand to a worker thread.
+    Its requests then count towards the query open here.
+    """
+    context = copy_context()
+    return lambda: context.run(job)
+
+
+@dataclass
+class QueryStats:
+    """
+    Network I/O for one logical query, summed over every time it ran
+    :param `wall_time`: seconds from the first request to the last response
+    :param `bytes_out`: request bodies sent
+    :param `bytes_in`: response bodies received
+    :param `pages`: GraphQL pages or multicall batches
+    :param `calls`: HTTP requests, including retries
+    :param `retries`: requests repeated after a transient failure, on the same or another endpoint
+    :param `hedges`: requests also sent to a second endpoint because the first was slow to answer
+    :param `errors`: times the query failed outright
+    """
+
+    wall_time: float = 0.0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    pages: int = 0
+    calls: int = 0
+    retries: int = 0
+    hedges: int = 0
+    errors: int = 0
+
+
+class NetworkTelemetry:
+    def __init__(self):
+        self.queries: dict[str, QueryStats] = {}
+        self._current: ContextVar[Optional[str]] = ContextVar("query", default=None)
+        self._lock = _Lock()
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """
+        Attribute network activity inside the block to the query `name`
+        Nested queries are counted as part of the outermost one, so wall time is never counted twice.
+        """
+        if self._current.get() is not None:
+            yield
+            return
+
+        token = self._current.set(name)
+        start = perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(errors=1)
+            raise
+        finally:
+            self.record(wall_time=perf_counter() - start)
+            self._current.reset(token)
+
+    def record(self, **counts: float) -> None:
+        """Add `counts` to the stats of the query open in the current context"""
+        name = self._current.get() or UNATTRIBUTED
+        with self._lock:
+            stats = self.queries.setdefault(name, QueryStats())
+            for field, value in counts.items():
+                setattr(stats, field, getattr(stats, field) + value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.queries = {}
+
+    def to_dict(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: asdict(stats) for name, stats in self.queries.items()}
+
+    def to_prometheus(self, queries: dict[str, dict], epoch: str) -> str:
+        """Render `queries` in the Prometheus text exposition format, one gauge per stat"""
+        lines = []
+        for field in fields(QueryStats):
+            metric = f"auxo_reporter_network_{field.name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for name, stats in sorted(queries.items()):
+                labels = f'epoch="{epoch}",query="{name}"'
+                lines.append(f"{metric}{{{labels}}} {stats[field.name]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str, epoch: str) -> None:
+        """
+        Write `network.json` and `network.prom` to `directory`, usually `reports/{epoch}/perf`
+        Queries from earlier runs of the epoch (eg: ARV before PRV) are kept unless measured again.
+        The textfile is also copied to `PROMETHEUS_TEXTFILE_DIR` if set, for scheduled runs.
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        path = Path(directory) / "network.json"
+
+        queries = json.loads(path.read_text())["queries"] if path.exists() else {}
+        queries.update(self.to_dict())
+
+        with open(path, "w") as f:
+            json.dump({"epoch": epoch, "queries": queries}, f, indent=4)
+
+        textfile = self.to_prometheus(queries, epoch)
+        write_atomic(Path(directory) / "network.prom", textfile)
+        if TELEMETRY.PROMETHEUS_TEXTFILE_DIR:
+            write_atomic(
+                Path(TELEMETRY.PROMETHEUS_TEXTFILE_DIR) / "auxo_reporter.prom", textfile
+            )
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """The textfile collector may read at any time, so never expose a half written file"""
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+network_telemetry = NetworkTelemetry()
@@ -1,26 +1,33 @@
 from decimal import Decimal
-from reporter.queries.common import w3
+from typing import Union
+
 from reporter.env import ADDRESSES
+from reporter.models import EthereumAddress
+from reporter.queries.block_snapshot import SnapshotReader
+from reporter.queries.common import RawCall, get_w3, multicall_raw
+
+PRV_TOTAL_SUPPLY = "prv_total_supply"
+
+
+def total_supply(token: EthereumAddress) -> RawCall:
+    return RawCall(token, "totalSupply()(uint256)")
 
-# simplified ABI containing just the fragment we want to use
-ERC20_TOTAL_SUPPLY_ABI = """
-    [{
-      "inputs": [],
-      "name": "totalSupply",
-      "outputs": [
-        {
-          "internalType": "uint256",
-          "name": "",
-          "type": "uint256"
-        }
-      ],
-      "stateMutability": "view",
-      "type": "function"
-    }]
-    """
 
+def queue_prv_total_supply(reader: SnapshotReader) -> None:
+    """Read the PRV supply in the next multicall `reader` makes, eg: the staked balances"""
+    reader.add(PRV_TOTAL_SUPPLY, total_supply(ADDRESSES.PRV))
+
+
+def get_prv_total_supply(at: Union[SnapshotReader, int, str] = "latest") -> Decimal:
+    """
+    PRV supply at the snapshot block of a `SnapshotReader`, read on its own if it wasn't queued ahead of another multicall.
+    Also takes a block number or "latest", to read the supply there in a call of its own.
+    """
+    if isinstance(at, SnapshotReader):
+        queue_prv_total_supply(at)
+        return Decimal(at.get(PRV_TOTAL_SUPPLY))
 
-def get_prv_total_supply(at="latest") -> Decimal:
-    PRV_CONTRACT = w3.eth.contract(abi=ERC20_TOTAL_SUPPLY_ABI, address=ADDRESSES.PRV)  # type: ignore
-    supply = PRV_CONTRACT.functions.totalSupply().call(block_identifier=at)  # type: ignore
-    return Decimal(supply)
+    block = get_w3().eth.block_number if at == "latest" else int(at)
+    read = (PRV_TOTAL_SUPPLY, total_supply(ADDRESSES.PRV), ())
+    supply = multicall_raw([read], block, name=PRV_TOTAL_SUPPLY)
+    return Decimal(supply[PRV_TOTAL_SUPPLY])
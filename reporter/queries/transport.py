@@ -0,0 +1,316 @@
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeout
+from json import dumps
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from reporter.env import GRAPHQL, HTTP, MULTICALL
+from reporter.errors import EndpointUnavailable, TransportError
+from reporter.queries.telemetry import in_context, network_telemetry
+
+if TYPE_CHECKING:
+    from reporter.queries.recording import Recording
+
+"""
+All GraphQL traffic goes through a single transport object.
+Sessions are kept alive and pooled per host, so each page reuses the same TLS connection,
+and transient failures (rate limits, 5xx, dropped connections) are retried with backoff
+instead of failing the whole run.
+
+Any endpoint may be a comma-separated list of URLs serving the same data, eg: `RPC_URL=https://a,https://b`.
+Requests go to the healthiest URL and fail over to the next one when it errors, see `EndpointPool`.
+Requests for data that can't change (pinned to a block) can also be hedged: if the first URL hasn't answered
+within its usual (p95) latency, the request is sent to a second one as well and the first answer wins.
+"""
+
+# rate limited or the server/gateway is having a bad time
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def encode(json: Any) -> bytes:
+    """Serialize once up front, so the request size is known. Pre-encoded bodies are sent as-is"""
+    return json if isinstance(json, bytes) else dumps(json).encode()
+
+
+# latencies kept per endpoint, and needed before its p95 is trusted for hedging
+LATENCY_WINDOW = 100
+MIN_LATENCY_SAMPLES = 20
+
+
+class Endpoint:
+    """
+    A single URL of a source, with the health measured from its recent requests
+    :param `cooldown`: seconds a failing endpoint is avoided for, doubled for each consecutive failure
+    """
+
+    def __init__(self, url: str, cooldown: float = 30):
+        self.url = url
+        self.cooldown = cooldown
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.failures = 0
+        self.down_until = 0.0
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"<Endpoint {self.url} failures={self.failures}>"
+
+    def success(self, seconds: float) -> None:
+        with self._lock:
+            self.latencies.append(seconds)
+            self.failures = 0
+            self.down_until = 0.0
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            backoff = self.cooldown * 2 ** min(self.failures - 1, 4)
+            self.down_until = time.monotonic() + backoff
+
+    def is_down(self) -> bool:
+        return time.monotonic() < self.down_until
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile `q` of the recent requests, unknown until enough have completed"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        return latencies[int(q * (len(latencies) - 1))]
+
+    def median(self) -> float:
+        with self._lock:
+            latencies = sorted(self.latencies)
+        return latencies[len(latencies) // 2] if latencies else float("inf")
+
+
+class EndpointPool:
+    """
+    The comma-separated URLs serving one source, ranked by health.
+    Endpoints that recently failed come last, the rest are ordered by median latency.
+    Endpoints that haven't been measured yet keep the order they were given in, so the first URL is the primary.
+    """
+
+    def __init__(self, urls: str, cooldown: float = 30):
+        self.endpoints = [
+            Endpoint(url.strip(), cooldown) for url in urls.split(",") if url.strip()
+        ]
+        if not self.endpoints:
+            raise TransportError(f"No endpoint in {urls!r}")
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def ranked(self) -> list[Endpoint]:
+        return [
+            endpoint
+            for _, endpoint in sorted(
+                enumerate(self.endpoints),
+                key=lambda e: (e[1].is_down(), e[1].median(), e[0]),
+            )
+        ]
+
+
+def primary(url: str) -> str:
+    """The first URL of a comma-separated endpoint list"""
+    return url.split(",")[0].strip()
+
+
+class HTTPTransport:
+    """
+    Pooled, retrying HTTP client
+    :param `timeout`: seconds to wait for the connection and for each read
+    :param `max_retries`: attempts after the first one before giving up
+    :param `backoff`: base delay in seconds, doubled on every retry
+    :param `max_backoff`: upper bound on a single delay, including `Retry-After` hints
+    :param `pool_size`: connections kept alive per host
+    :param `hedge`: send immutable requests to a second endpoint when the first is slower than its p95
+    :param `cooldown`: seconds a failing endpoint is avoided for, see `Endpoint`
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        pool_size: int = 10,
+        hedge: bool = False,
+        cooldown: float = 30,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.hedge = hedge
+        self.cooldown = cooldown
+        self._sessions: dict[str, requests.Session] = {}
+        self._pools: dict[str, EndpointPool] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+        # set by `transport_mode` to record or replay every response
+        self.recording: Optional["Recording"] = None
+
+    def session(self, url: str) -> requests.Session:
+        """Fetch the keep-alive session for the host of `url`, creating it on first use"""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_size, pool_maxsize=self.pool_size
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return self._sessions[host]
+
+    def pool(self, url: str) -> EndpointPool:
+        """Endpoints for `url`, a single URL or a comma-separated list, kept with their health between requests"""
+        with self._lock:
+            if url not in self._pools:
+                self._pools[url] = EndpointPool(url, self.cooldown)
+            return self._pools[url]
+
+    def executor(self) -> ThreadPoolExecutor:
+        """Workers sending hedged requests, created on the first one"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2 * self.pool_size)
+            return self._executor
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Exponential backoff with full jitter, bounded by `max_backoff`.
+        A numeric `Retry-After` header from the server takes precedence.
+        """
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def post(self, url: str, json: Any, hedge: bool = False) -> bytes:
+        """
+        POST a JSON payload and return the raw response body.
+        Non-retryable responses (eg: a 400 with GraphQL errors) are returned as-is for the caller to inspect.
+        :param `url`: a URL or comma-separated URLs, failed requests are retried on the next healthiest one
+        :param `hedge`: the response can't change, so the request may also be sent to a second endpoint
+        """
+        body = encode(json)
+        recording = self.recording
+        if recording and recording.replaying:
+            return recording.replay(url, body)
+
+        pool = self.pool(url)
+        attempt = 0
+        while True:
+            try:
+                if hedge and self.hedge:
+                    content = self.send_hedged(pool, body)
+                else:
+                    content = self.send(pool.ranked()[0], body)
+                if recording:
+                    recording.record(url, body, content)
+                return content
+            except EndpointUnavailable as e:
+                reason, retry_after = str(e), e.retry_after
+
+            if attempt >= self.max_retries:
+                raise TransportError(
+                    f"Request to {url} failed after {attempt + 1} attempts: {reason}"
+                )
+            network_telemetry.record(retries=1)
+            # fail over straight away, only backing off once every endpoint has been tried
+            if (attempt + 1) % len(pool) == 0:
+                time.sleep(self.delay(attempt // len(pool), retry_after))
+            attempt += 1
+
+    def send(self, endpoint: Endpoint, body: bytes) -> bytes:
+        """A single request to `endpoint`, raising `EndpointUnavailable` for anything worth retrying"""
+        session = self.session(endpoint.url)
+        network_telemetry.record(calls=1, bytes_out=len(body))
+        start = time.perf_counter()
+        try:
+            response = session.post(
+                endpoint.url, data=body, headers=JSON_HEADERS, timeout=self.timeout
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            endpoint.failure()
+            raise EndpointUnavailable(str(e))
+
+        network_telemetry.record(bytes_in=len(response.content))
+        if response.status_code in RETRY_STATUSES:
+            endpoint.failure()
+            raise EndpointUnavailable(
+                f"HTTP {response.status_code}", response.headers.get("Retry-After")
+            )
+        endpoint.success(time.perf_counter() - start)
+        return response.content
+
+    def send_hedged(self, pool: EndpointPool, body: bytes) -> bytes:
+        """
+        Send to the healthiest endpoint, and to the next one as well if the first
+        hasn't answered within its p95 latency. The first successful answer is returned.
+        """
+        first, *others = pool.ranked()
+        wait = first.percentile(0.95)
+        if not others or wait is None:
+            return self.send(first, body)
+
+        executor = self.executor()
+        # each request runs in a copy of this context, so it counts towards the open query
+        primary = executor.submit(in_context(lambda: self.send(first, body)))
+        try:
+            return primary.result(timeout=wait)
+        except FutureTimeout:
+            pass
+
+        network_telemetry.record(hedges=1)
+        hedged = executor.submit(in_context(lambda: self.send(others[0], body)))
+        errors: list[EndpointUnavailable] = []
+        for future in as_completed([primary, hedged]):
+            try:
+                return future.result()
+            except EndpointUnavailable as e:
+                errors.append(e)
+        # both endpoints failed, retry as for any other unavailable endpoint
+        raise errors[-1]
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def default_pool_size() -> int:
+    """
+    Requests the run can have in flight at once: the GraphQL shards alongside the multicall batches,
+    doubled when hedging, as each may also be sent to a second endpoint
+    """
+    in_flight = GRAPHQL.CONCURRENCY + max(
+        MULTICALL.CONCURRENCY, MULTICALL.RPC_CONCURRENCY
+    )
+    return in_flight * (2 if HTTP.HEDGE else 1)
+
+
+default_transport = HTTPTransport(
+    timeout=HTTP.TIMEOUT,
+    pool_size=default_pool_size(),
+    max_retries=HTTP.MAX_RETRIES,
+    backoff=HTTP.BACKOFF,
+    max_backoff=HTTP.MAX_BACKOFF,
+    hedge=HTTP.HEDGE,
+    cooldown=HTTP.FAILOVER_COOLDOWN,
+)
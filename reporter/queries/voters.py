@@ -1,4 +1,5 @@
-from typing import Any
+import time
+from typing import Any, Iterator
 from pydantic import parse_obj_as
 import reporter.utils as utils
 from reporter.env import ADDRESSES, SNAPSHOT_SPACE_ID
@@ -11,15 +12,37 @@ from reporter.models import (
     OnChainVote,
     ARVStaker,
 )
-from reporter.queries.common import SUBGRAPHS, graphql_iterate_query
+from reporter.queries.common import (
+    SUBGRAPHS,
+    GraphQLQuery,
+    Pagination,
+    run_concurrently,
+    stream_query,
+    time_shards,
+)
+
+
+# give the indexers time to catch up before treating a time window as final
+SETTLEMENT_DELAY = 60 * 60
+
+
+def is_settled(end_timestamp: int) -> bool:
+    """Votes can't be cast in the past, so a window that has closed will never change"""
+    return end_timestamp < time.time() - SETTLEMENT_DELAY
 
 
-def get_offchain_votes(conf: Config):
-    """Fetch snapshot votes for the DAO between start and end timestamps in config object"""
+def offchain_votes_query(conf: Config) -> GraphQLQuery:
+    """Query for snapshot votes for the DAO between start and end timestamps in config object"""
 
     votes_query = """
-        query($skip: Int, $space: String, $created_gte: Int, $created_lte: Int) { 
-            votes(skip: $skip, first: 1000, where: {space: $space, created_gte: $created_gte, created_lte: $created_lte}) {
+        query($cursor: Int, $space: String, $created_lte: Int) { 
+            votes(
+                first: 1000
+                orderBy: "created"
+                orderDirection: asc
+                where: {space: $space, created_gte: $cursor, created_lte: $created_lte}
+            ) {
+                id
                 voter
                 choice
                 created
@@ -36,34 +59,50 @@ def get_offchain_votes(conf: Config):
         }
     """
 
+    # snapshot has no `id_gt` filter, so we page on the creation time instead
     variables = {
-        "skip": 0,
+        "cursor": conf.start_timestamp,
         "space": SNAPSHOT_SPACE_ID,
-        "created_gte": conf.start_timestamp,
         "created_lte": conf.end_timestamp,
     }
 
-    votes: list[Any] = graphql_iterate_query(
-        SUBGRAPHS.SNAPSHOT, ["votes"], dict(query=votes_query, variables=variables)
+    return GraphQLQuery(
+        SUBGRAPHS.SNAPSHOT,
+        ["votes"],
+        dict(query=votes_query, variables=variables),
+        pagination=Pagination.CURSOR,
+        cursor_field="created",
+        cacheable=is_settled(conf.end_timestamp),
+        # windows share their boundary second, repeated votes are dropped when merging
+        shards=time_shards(
+            conf.start_timestamp, conf.end_timestamp, "cursor", "created_lte"
+        ),
+        name="snapshot_votes",
     )
-    return votes
 
 
-def get_onchain_votes(conf: Config) -> list:
+def get_offchain_votes(conf: Config) -> Iterator[Any]:
     """
-    Grab vote proposals and votes from OZ Governor
-    To check: does the OZ implementation check delegation?
+    Fetch snapshot votes for the DAO between start and end timestamps in config object
+    Votes are yielded lazily, so they can be parsed while the next page is fetched.
     """
+    return stream_query(offchain_votes_query(conf))
+
+
+def onchain_votes_query(conf: Config) -> GraphQLQuery:
+    """Query for OZ Governor votes between start and end timestamps in config object"""
 
     votes_query = """
-    query($governor: String, $timestamp_gt: Int, $timestamp_lte: Int, $skip: Int) {
+    query($governor: String, $timestamp_gt: Int, $timestamp_lte: Int, $cursor: String) {
         voteCasts(
             first: 1000
-            skip: $skip
+            orderBy: id
+            orderDirection: asc
             where: { 
                 timestamp_gt: $timestamp_gt,
                 timestamp_lte: $timestamp_lte,
-                governor: $governor
+                governor: $governor,
+                id_gt: $cursor
             }
         ) {
             id
@@ -99,17 +138,30 @@ def get_onchain_votes(conf: Config) -> list:
     """
 
     variables = {
-        "skip": 0,
+        "cursor": "",
         "governor": ADDRESSES.GOVERNOR,
         "timestamp_gt": conf.start_timestamp,
         "timestamp_lte": conf.end_timestamp,
     }
-    votes: list[Any] = graphql_iterate_query(
+    return GraphQLQuery(
         SUBGRAPHS.AUXO_GOV,
         ["voteCasts"],
         dict(query=votes_query, variables=variables),
+        pagination=Pagination.CURSOR,
+        cacheable=is_settled(conf.end_timestamp),
+        shards=time_shards(
+            conf.start_timestamp, conf.end_timestamp, "timestamp_gt", "timestamp_lte"
+        ),
+        name="governor_votes",
     )
-    return votes
+
+
+def get_onchain_votes(conf: Config) -> Iterator[Any]:
+    """
+    Grab vote proposals and votes from OZ Governor, yielded lazily as pages arrive
+    To check: does the OZ implementation check delegation?
+    """
+    return stream_query(onchain_votes_query(conf))
 
 
 def filter_votes_by_proposal(
@@ -211,13 +263,20 @@ def combine_on_off_chain_votes(
     return offchain + coerced
 
 
-def get_votes(conf: Config) -> tuple[list[Vote], list[Proposal]]:
+def fetch_votes(conf: Config) -> list[Vote]:
     """
-    Fetch all votes from offchain and onchain sources and combine them
+    Fetch all votes from offchain and onchain sources and combine them.
+    Snapshot and the governor subgraph are independent, so they are fetched at the same time.
     """
-    offchain_votes = parse_offchain_votes(conf)
-    onchain_votes = parse_onchain_votes(conf)
+    offchain_votes, onchain_votes = run_concurrently(
+        lambda: parse_offchain_votes(conf),
+        lambda: parse_onchain_votes(conf),
+    )
+    return combine_on_off_chain_votes(offchain_votes, onchain_votes)
 
-    combined_votes = combine_on_off_chain_votes(offchain_votes, onchain_votes)
 
-    return filter_votes_by_proposal(combined_votes)
+def get_votes(conf: Config) -> tuple[list[Vote], list[Proposal]]:
+    """
+    Fetch all votes from offchain and onchain sources, combine them and filter by proposal
+    """
+    return filter_votes_by_proposal(fetch_votes(conf))
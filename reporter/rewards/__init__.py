@@ -1,3 +1,5 @@
+from reporter.rewards.table import *
+from reporter.rewards.stats import *
 from reporter.rewards.common import *
 from reporter.rewards.prv import *
 from reporter.rewards.arv import *
@@ -1,5 +1,5 @@
 from decimal import Decimal
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 from reporter import utils
 from reporter.models import (
@@ -10,11 +10,39 @@ from reporter.models import (
     TokenSummaryStats,
     ARVRewardSummary,
 )
-from reporter.rewards import compute_rewards
+from reporter.rewards import compute_table_rewards
+from reporter.rewards.stats import aggregate_token_stats
+from reporter.rewards.table import AccountTable
+
+
+def init_account_table(
+    stakers: list[ARVStaker], voters: Iterable[str], conf: Config
+) -> AccountTable:
+    """
+    Create the base accounts from a list of stakers.
+    Rewards will be added later based on the account state.
+
+    :param `stakers`: all vetoken stakers
+    :param `voters`: all accounts that voted that month
+    """
+    # a set, so checking each staker doesn't scan the voters
+    voted = set(voters)
+    table = AccountTable()
+    for staker in stakers:
+        table.append(
+            Account.from_arv_staker(
+                staker,
+                state=AccountState.ACTIVE
+                if staker.address in voted
+                else AccountState.INACTIVE,
+                rewards=conf.reward_token(),
+            )
+        )
+    return table
 
 
 def init_account_rewards(
-    stakers: list[ARVStaker], voters: list[str], conf: Config
+    stakers: list[ARVStaker], voters: Iterable[str], conf: Config
 ) -> list[Account]:
     """
     Create the base Account object from a list of stakers.
@@ -23,16 +51,7 @@ def init_account_rewards(
     :param `stakers`: all vetoken stakers
     :param `voters`: list of all accounts that voted that month
     """
-    return [
-        Account.from_arv_staker(
-            staker,
-            state=AccountState.ACTIVE
-            if staker.address in voters
-            else AccountState.INACTIVE,
-            rewards=conf.reward_token(),
-        )
-        for staker in stakers
-    ]
+    return init_account_table(stakers, voters, conf).to_accounts()
 
 
 def tokens_by_status(
@@ -51,16 +70,7 @@ def tokens_by_status(
 
 def compute_token_stats(accounts: list[Account]) -> TokenSummaryStats:
     """Summarize token balances by state"""
-    total_active_tokens = tokens_by_status(accounts, AccountState.ACTIVE)
-    total_inactive_tokens = tokens_by_status(accounts, AccountState.INACTIVE)
-    total_tokens = tokens_by_status(accounts, None)
-
-    tokenStats = TokenSummaryStats(
-        total=str(int(total_tokens)),
-        active=str(int(total_active_tokens)),
-        inactive=str(int(total_inactive_tokens)),
-    )
-    return tokenStats
+    return aggregate_token_stats(AccountTable.from_accounts(accounts))
 
 
 def distribute(
@@ -68,11 +78,9 @@ def distribute(
 ) -> Tuple[list[Account], ARVRewardSummary, TokenSummaryStats]:
     """Compute the distribution for all accounts, and summarize the data"""
 
-    accounts = init_account_rewards(stakers, voters, conf)
-    token_stats = compute_token_stats(accounts)
-    distribution, distribution_rewards = compute_rewards(
-        conf.arv_erc20, Decimal(token_stats.active), accounts
-    )
+    table = init_account_table(stakers, voters, conf)
+    token_stats = aggregate_token_stats(table)
+    rewarded, distribution_rewards = compute_table_rewards(conf.arv_erc20, table)
     summary = ARVRewardSummary.from_existing(distribution_rewards)
 
-    return (distribution, summary, token_stats)
+    return (rewarded.to_accounts(), summary, token_stats)
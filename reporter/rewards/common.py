@@ -1,6 +1,6 @@
 import itertools
 from decimal import Decimal
-from copy import deepcopy
+from typing import Sequence
 
 from reporter.models import (
     Account,
@@ -8,56 +8,74 @@ from reporter.models import (
     ERC20Amount,
     RewardSummary,
 )
+from reporter.rewards.table import AccountTable, Note
 
 
-def distribute_rewards(account: Account, pro_rata: Decimal) -> Account:
+def pro_rata_rewards(
+    balances: Sequence[int], active: Sequence[bool], total: int
+) -> tuple[list[int], int]:
     """
-    Add the rewards for the account, for a particular token.
-    :param `account`: the account to add rewards to
-    :param `pro_rata`: quantity of reward token to be add per token units held by account
+    Split `total` reward units across the active balances in proportion to their size.
+    Every reward is the exact `balance * total // active_total` in integers, so nothing
+    is lost to Decimal precision and the rewards can never add up to more than `total`.
+
+    :param `balances`: token balance of each account, in the smallest units
+    :param `active`: whether each account is eligible, inactive accounts get 0
+    :param `total`: reward units to distribute
+    :returns: the reward for each balance, and the dust left over from rounding down
     """
-    # pass by reference can cause errors, so we allocate a new item in memory
-    new_account = deepcopy(account)
-    if account.state == AccountState.ACTIVE:
-        account_reward = int(pro_rata * Decimal(account.token.amount))
-        new_account.rewards.amount = str(
-            Decimal(account.rewards.amount) + account_reward
-        )
-        new_account.notes.append(f"active reward of {account_reward}")
-    return new_account
+    active_total = sum(itertools.compress(balances, active))
+    if active_total == 0:
+        return [0] * len(balances), total
 
+    rewards = [
+        balance * total // active_total if is_active else 0
+        for balance, is_active in zip(balances, active)
+    ]
+    return rewards, total - sum(rewards)
 
-def compute_rewards(
-    total_rewards: ERC20Amount, total_tokens: Decimal, accounts: list[Account]
-) -> tuple[list[Account], RewardSummary]:
-    """
 
-    Add the rewards that will be distributed across all users, including the pro-rata reward rate for each token
-    Modifies the accounts object to add rewards
+def compute_table_rewards(
+    total_rewards: ERC20Amount, table: AccountTable
+) -> tuple[AccountTable, RewardSummary]:
+    """
+    Add the rewards that will be distributed across all users, including the pro-rata reward rate for each token.
+    Rewards are split across the tokens of the active accounts, which the reported rate is also based on.
 
     :param `total_rewards`: rewards token with total quantities to distribute amongst recipients
-    :param `total_tokens`: Will be active tokens in the case of stakers
-    :param `accounts`: base array of Account objects that have yet to have rewards added
+    :param `table`: accounts that have yet to have rewards added, left as they are
     """
-    pro_rata = 0 if total_tokens == 0 else Decimal(total_rewards.amount) / total_tokens
-
-    rewarded_accounts = list(
-        map(
-            distribute_rewards,  # type: ignore
-            accounts,
-            itertools.repeat(pro_rata),  # type: ignore
-        )
+    active_tokens = table.tokens(AccountState.ACTIVE)
+    pro_rata = (
+        0 if active_tokens == 0 else Decimal(total_rewards.amount) / active_tokens
     )
-    """ 
-    the active rewards are correctly inserted as a string
-    but the total is incorrect
-    
-    """
+
+    rewards, dust = pro_rata_rewards(
+        table.amount,
+        table.mask(AccountState.ACTIVE),
+        int(Decimal(total_rewards.amount)),
+    )
+    rewarded = table.copy()
+    for row in rewarded.rows(AccountState.ACTIVE):
+        rewarded.add_reward(row, rewards[row], Note.ACTIVE_REWARD)
 
     # add to summary
     distribution_rewards = RewardSummary(
         **total_rewards.dict(),
         pro_rata=str(pro_rata),
+        dust=str(dust),
     )
 
-    return rewarded_accounts, distribution_rewards
+    return rewarded, distribution_rewards
+
+
+def compute_rewards(
+    total_rewards: ERC20Amount, accounts: list[Account]
+) -> tuple[list[Account], RewardSummary]:
+    """
+    `compute_table_rewards` for a list of accounts, returning a new list with the rewards added
+    """
+    rewarded, distribution_rewards = compute_table_rewards(
+        total_rewards, AccountTable.from_accounts(accounts)
+    )
+    return rewarded.to_accounts(), distribution_rewards
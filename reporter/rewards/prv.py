@@ -1,5 +1,6 @@
 from decimal import Decimal
-from copy import deepcopy
+from typing import Union
+from reporter.errors import BadConfigException
 from reporter.models import (
     Account,
     AccountState,
@@ -12,6 +13,9 @@ from reporter.models import (
     PRVRewardSummary,
     RewardSummary,
 )
+from reporter.models.types import to_checksum_address
+from reporter.rewards.stats import aggregate_token_stats
+from reporter.rewards.table import AccountTable, Note
 
 
 def prv_active_rewards(
@@ -40,29 +44,51 @@ def prv_active_rewards(
 
 
 def compute_prv_token_stats(
-    accounts: list[Account], total_supply: Decimal
+    accounts: Union[list[Account], AccountTable], total_supply: Decimal
 ) -> TokenSummaryStats:
     """
     Computes summary statistics for a token based on a list of accounts holding that token.
 
     Args:
-        accounts: A list of Account objects representing the accounts holding the token.
+        accounts: the accounts holding the token, as a list or a table.
         total_supply: The total supply of the token.
 
     Returns:
         A TokenSummaryStats object containing the total, active, and inactive amounts of the token.
 
     """
-    active = sum(int(a.token.amount) for a in accounts)
-    return TokenSummaryStats(
-        total=str(total_supply),
-        active=str(active),
-        inactive=str(int(total_supply) - active),
-    )
+    if not isinstance(accounts, AccountTable):
+        accounts = AccountTable.from_accounts(accounts)
+    return aggregate_token_stats(accounts, total_supply)
+
+
+def apply_transfer(table: AccountTable, r: RedistributionWeight, conf: Config) -> None:
+    """
+    Adds a transfer to the receiving account of `table`, in place.
+    Args:
+        table: the accounts that may receive the transfer.
+        r: A RedistributionWeight object specifying the account address and transfer amount.
+        conf: A Config object containing information on reward tokens.
+    """
+    if r.address is None:
+        raise BadConfigException("Must provide a transfer address to transfer rewards")
+    address = to_checksum_address(r.address)
+
+    # cant find the account in the table this is a new account (like a multisig)
+    # set it as inactive and add the transfer
+    row = table.index.get(address)
+    if row is None:
+        row = table.add(
+            address,
+            token=PRV(amount="0"),
+            rewards=conf.reward_token(amount="0"),
+            state=AccountState.INACTIVE,
+        )
+    table.add_reward(row, int(r.rewards), Note.TRANSFER, r.rewards)
 
 
 def transfer_redistribution(
-    _accounts: list[Account], r: RedistributionWeight, conf: Config
+    accounts: list[Account], r: RedistributionWeight, conf: Config
 ) -> list[Account]:
     """
     Redistributes rewards via a transfer to a specific account.
@@ -71,51 +97,38 @@ def transfer_redistribution(
         r: A RedistributionWeight object specifying the account address and transfer amount.
         conf: A Config object containing information on reward tokens.
     """
-    accounts = deepcopy(_accounts)
-    # check to see if the account already is due to receive rewards
-    found_account = False
-    for account in accounts:
-        # account found, add the additional transfer
-        if account.address == r.address:
-            found_account = True
-            account.notes.append(f"Transfer of {r.rewards}")
-            account.rewards.amount = str(int(account.rewards.amount) + int(r.rewards))
-
-    # cant find the account in the list this is a new account (like a multisig)
-    # set it as inactive and add the transfer
-    if not found_account:
-        accounts.append(
-            Account(
-                address=r.address,
-                token=PRV(amount="0"),
-                rewards=conf.reward_token(amount=str(r.rewards)),
-                state=AccountState.INACTIVE,
-                notes=[f"Transfer of {r.rewards}"],
-            )
-        )
-    return accounts
+    table = AccountTable.from_accounts(accounts)
+    apply_transfer(table, r, conf)
+    return table.to_accounts()
 
 
-def redistribute(
-    _accounts: list[Account], container: RedistributionContainer, conf: Config
-) -> list[Account]:
+def redistribute_table(
+    table: AccountTable, container: RedistributionContainer, conf: Config
+) -> AccountTable:
     """
     Redistributes rewards to accounts based on a list of redistribution weights.
     Args:
-        accounts: A list of Account objects representing accounts to receive rewards.
+        table: the accounts to receive rewards, left as they are.
         redistributions: A list of RedistributionWeight objects specifying the rewards to be distributed.
         conf: A Config object containing information on reward tokens.
     Returns:
-        the updated accounts list
+        a new table with the transfers added
     """
-    # copy so as not to modify the original
-    accounts = deepcopy(_accounts)
+    redistributed = table.copy()
 
     # go through the accounts and make any manual transfers
     for r in container.redistributions:
         if r.option == RedistributionOption.TRANSFER:
-            accounts = transfer_redistribution(accounts, r, conf)
-    return accounts
+            apply_transfer(redistributed, r, conf)
+    return redistributed
+
+
+def redistribute(
+    accounts: list[Account], container: RedistributionContainer, conf: Config
+) -> list[Account]:
+    """`redistribute_table` for a list of accounts, returning a new list with the transfers added"""
+    table = AccountTable.from_accounts(accounts)
+    return redistribute_table(table, container, conf).to_accounts()
 
 
 def create_prv_reward_summary(
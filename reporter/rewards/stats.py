@@ -0,0 +1,63 @@
+import math
+from decimal import Decimal
+from typing import Optional, Union
+
+from reporter.models import AccountState, BalanceDistribution, TokenSummaryStats
+from reporter.rewards.table import AccountTable
+
+"""
+Token statistics for the `ARV_stats` and `PRV_stats` reports.
+
+Totals and counts by state are gathered in one walk over the columns of an `AccountTable`,
+the balances are then sorted once for the min, max and percentiles.
+"""
+
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+
+def percentile(ordered: list[int], pc: int) -> int:
+    """Nearest-rank percentile of a sorted, non-empty list"""
+    rank = max(math.ceil(pc / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def balance_distribution(amounts: list[int]) -> BalanceDistribution:
+    if not amounts:
+        return BalanceDistribution()
+    ordered = sorted(amounts)
+    return BalanceDistribution(
+        min=str(ordered[0]),
+        max=str(ordered[-1]),
+        percentiles={f"p{pc}": str(percentile(ordered, pc)) for pc in PERCENTILES},
+    )
+
+
+def aggregate_token_stats(
+    table: AccountTable, total_supply: Optional[Union[int, Decimal]] = None
+) -> TokenSummaryStats:
+    """
+    Sum and count the token balances of `table` by state, and summarize their spread.
+
+    :param `table`: accounts holding the token
+    :param `total_supply`: tokens in circulation, if not every holder is in `table`.
+        Tokens not held by an active account are then counted as inactive, as for PRV.
+    """
+    total = active = active_accounts = 0
+    for amount, state in zip(table.amount, table.state):
+        total += amount
+        if state == AccountState.ACTIVE:
+            active += amount
+            active_accounts += 1
+
+    if total_supply is not None:
+        total = int(total_supply)
+
+    return TokenSummaryStats(
+        total=str(total),
+        active=str(active),
+        inactive=str(total - active),
+        accounts=len(table),
+        active_accounts=active_accounts,
+        inactive_accounts=len(table) - active_accounts,
+        balances=balance_distribution(table.amount),
+    )
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import itertools
+from enum import Enum
+from typing import Any, Iterator, Optional
+
+from reporter.models import Account, AccountState, ERC20Amount
+from reporter.models.types import EthereumAddress
+
+"""
+The rewards pipeline works on an `AccountTable` rather than on a `list[Account]`.
+
+Accounts are held as columns, one row per address, with an index from address to row,
+so finding an account, filtering by state and adding a reward don't scan every account
+and sums over a column don't touch the pydantic models at all.
+
+Models are converted only at the edges: `AccountTable.from_accounts` when the accounts come in,
+and `to_accounts` when the distribution is written. Rows that were never updated give back
+the account they were read from, and updated rows share every field but the rewards and notes.
+"""
+
+
+class Note(str, Enum):
+    """
+    Notes are stored as a code and a value, and only formatted when converting back to accounts
+    :state ACTIVE_REWARD: the pro-rata reward of an active account
+    :state TRANSFER: a redistribution transferred to the account
+    :state TEXT: a note that was already on the account
+    """
+
+    ACTIVE_REWARD = "active reward of {}"
+    TRANSFER = "Transfer of {}"
+    TEXT = "{}"
+
+
+class AccountTable:
+    """
+    The accounts of a distribution, stored by column.
+    Tables are copied with `copy` before being updated, so a table passed to a function isn't modified.
+
+    :param `address`: checksummed address of each row, `index` maps them back to the row
+    :param `amount`: token balance of each row, in the smallest units
+    :param `rewards`: reward of each row, in the smallest units
+    :param `state`: whether each row is active or inactive
+    :param `notes`: (code, value) pairs explaining the rewards of each row
+    """
+
+    def __init__(self) -> None:
+        self.address: list[EthereumAddress] = []
+        self.token: list[ERC20Amount] = []
+        self.amount: list[int] = []
+        self.reward_token: list[ERC20Amount] = []
+        self.rewards: list[int] = []
+        self.state: list[AccountState] = []
+        self.notes: list[tuple[tuple[Note, Any], ...]] = []
+        self.index: dict[EthereumAddress, int] = {}
+        # the account each row was read from, if any, and the rows updated since
+        self.source: list[Optional[Account]] = []
+        self.updated: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.address)
+
+    def __contains__(self, address: object) -> bool:
+        return address in self.index
+
+    @staticmethod
+    def from_accounts(accounts: list[Account]) -> AccountTable:
+        table = AccountTable()
+        for account in accounts:
+            table.append(account)
+        return table
+
+    def append(self, account: Account) -> int:
+        """Add a row for an existing account, returning the row"""
+        row = self.add(
+            account.address,
+            account.token,
+            account.rewards,
+            account.state,
+            notes=tuple((Note.TEXT, note) for note in account.notes),
+        )
+        self.source[row] = account
+        return row
+
+    def add(
+        self,
+        address: EthereumAddress,
+        token: ERC20Amount,
+        rewards: ERC20Amount,
+        state: AccountState,
+        notes: tuple[tuple[Note, Any], ...] = (),
+    ) -> int:
+        """Add a row for a new account, `address` must already be checksummed"""
+        row = len(self.address)
+        self.address.append(address)
+        self.token.append(token)
+        self.amount.append(int(token.amount))
+        self.reward_token.append(rewards)
+        self.rewards.append(int(rewards.amount))
+        self.state.append(state)
+        self.notes.append(notes)
+        self.source.append(None)
+        self.index[address] = row
+        return row
+
+    def copy(self) -> AccountTable:
+        """A new table sharing every row with this one, cheap as only the columns are copied"""
+        table = AccountTable()
+        table.address = list(self.address)
+        table.token = list(self.token)
+        table.amount = list(self.amount)
+        table.reward_token = list(self.reward_token)
+        table.rewards = list(self.rewards)
+        table.state = list(self.state)
+        table.notes = list(self.notes)
+        table.index = dict(self.index)
+        table.source = list(self.source)
+        table.updated = set(self.updated)
+        return table
+
+    def mask(self, state: AccountState) -> list[bool]:
+        return [s == state for s in self.state]
+
+    def rows(self, state: Optional[AccountState] = None) -> Iterator[int]:
+        """Rows with `state`, or every row"""
+        if state is None:
+            return iter(range(len(self)))
+        return itertools.compress(itertools.count(), self.mask(state))
+
+    def tokens(self, state: Optional[AccountState] = None) -> int:
+        """Total token balance of the rows with `state`, or of every row"""
+        if state is None:
+            return sum(self.amount)
+        return sum(itertools.compress(self.amount, self.mask(state)))
+
+    def add_reward(self, row: int, amount: int, note: Note, value: Any = None) -> None:
+        """Add `amount` to the rewards of `row`, noting `value` (the amount by default)"""
+        self.rewards[row] += amount
+        self.notes[row] = (*self.notes[row], (note, amount if value is None else value))
+        self.updated.add(row)
+
+    def account(self, row: int) -> Account:
+        source = self.source[row]
+        if source is not None and row not in self.updated:
+            return source
+
+        rewards = self.reward_token[row].copy(update={"amount": str(self.rewards[row])})
+        notes = [note.format(value) for note, value in self.notes[row]]
+        if source is not None:
+            # only the rewards and notes can change, the other fields are shared with the source
+            return source.copy(update={"rewards": rewards, "notes": notes})
+        return Account(
+            address=self.address[row],
+            token=self.token[row],
+            rewards=rewards,
+            state=self.state[row],
+            notes=notes,
+        )
+
+    def to_accounts(self) -> list[Account]:
+        return [self.account(row) for row in range(len(self))]
@@ -5,10 +5,17 @@ from reporter.models import (
     Writer,
 )
 from reporter.queries import (
+    fetch_votes,
+    filter_votes_by_proposal,
     get_arv_stakers_and_boost,
     get_voters,
-    get_votes,
+    network_telemetry,
+    run_concurrently,
+    transport_mode,
+    SnapshotReader,
+    TransportMode,
 )
+from reporter.env import HTTP, SUBGRAPHS
 
 from reporter.rewards import distribute
 
@@ -32,11 +39,17 @@ def run_arv(path_to_config, directory="reports") -> None:
     # instantiate a fresh DB
     db = DB(config, drop=True, directory=directory)
 
-    # fetch ARV Stakers
-    stakers = get_arv_stakers_and_boost(config)
+    # fetch ARV Stakers and votes at the same time, neither depends on the other
+    with transport_mode(TransportMode(HTTP.MODE), f"{writer.path}/inputs.json.gz"):
+        reader = SnapshotReader(config)
+        reader.check_subgraphs(SUBGRAPHS.AUXO_STAKING, SUBGRAPHS.AUXO_GOV)
+        stakers, all_votes = run_concurrently(
+            lambda: get_arv_stakers_and_boost(config, reader),
+            lambda: fetch_votes(config),
+        )
 
-    # fetch votes and proposals
-    votes, proposals = get_votes(config)
+    # filter votes and proposals
+    votes, proposals = filter_votes_by_proposal(all_votes)
 
     # separate voters from non-voters
     voters, non_voters = get_voters(votes, stakers)
@@ -61,3 +74,6 @@ def run_arv(path_to_config, directory="reports") -> None:
     writer.to_csv_and_json([v.dict() for v in votes], "votes")
     writer.to_csv_and_json([p.dict() for p in proposals], "proposals")
     writer.lists_to_csv_and_json([("voters", voters), ("non_voters", non_voters)])
+
+    # record where the time went on the network
+    network_telemetry.write(f"{writer.path}/perf", config.date)
@@ -11,13 +11,20 @@ from reporter.errors import MissingDBException
 from reporter.queries import (
     get_prv_total_supply,
     get_prv_accounts,
+    network_telemetry,
+    queue_prv_total_supply,
+    transport_mode,
+    SnapshotReader,
+    TransportMode,
 )
+from reporter.env import HTTP, SUBGRAPHS
 from reporter.rewards import (
+    AccountTable,
     compute_prv_token_stats,
-    compute_rewards,
+    compute_table_rewards,
     prv_active_rewards,
     create_prv_reward_summary,
-    redistribute,
+    redistribute_table,
 )
 
 getcontext().prec = 42
@@ -43,27 +50,29 @@ def run_prv(path_to_config, directory="reports") -> None:
     # don't drop the DB as we rely on it
     db = DB(config, drop=False, directory=directory)
 
-
-    # compute supply at the passed block
-    supply = get_prv_total_supply(config.block_snapshot)
-
-    # fetch the list of accounts and compute active vs. total
-    accounts = get_prv_accounts(config)
+    # fetch the list of accounts at the snapshot block, the supply is read in the same multicall
+    with transport_mode(TransportMode(HTTP.MODE), f"{path}/inputs.json.gz"):
+        reader = SnapshotReader(config)
+        reader.check_subgraphs(SUBGRAPHS.AUXO_STAKING)
+        queue_prv_total_supply(reader)
+        accounts = get_prv_accounts(config, reader)
+        supply = get_prv_total_supply(reader)
 
     # compute the stats for the PRV token
-    prv_stats = compute_prv_token_stats(accounts, supply)
+    table = AccountTable.from_accounts(accounts)
+    prv_stats = compute_prv_token_stats(table, supply)
 
     # redistribute rewards accruing to inactive stakers
     (active_rewards, inactive_rewards) = prv_active_rewards(prv_stats, config)
 
     container = initialize_container(inactive_rewards, config)
-    accounts_redistributed = redistribute(accounts, container, config)
+    redistributed = redistribute_table(table, container, config)
 
-    distribution, distribution_rewards = compute_rewards(
+    rewarded, distribution_rewards = compute_table_rewards(
         config.reward_token(amount=str(active_rewards + container.to_stakers)),
-        Decimal(prv_stats.active),  # active PRV not rewards
-        accounts_redistributed,
+        redistributed,
     )
+    distribution = rewarded.to_accounts()
 
     # yield the summary for reporting
     summary = create_prv_reward_summary(distribution_rewards, container)
@@ -78,3 +87,6 @@ def run_prv(path_to_config, directory="reports") -> None:
 
     # write our data to individual CSV and JSON files
     writer.to_csv_and_json([s.dict() for s in accounts], "PRV_stakers")
+
+    # record where the time went on the network
+    network_telemetry.write(f"{writer.path}/perf", config.date)
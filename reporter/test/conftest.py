@@ -8,6 +8,7 @@ import pytest
 
 from reporter.config import load_conf
 from reporter.models import Config
+from reporter.queries.cache import eth_call_cache
 
 getcontext().prec = 45
 
@@ -22,6 +23,12 @@ _addresses = [
 TEST_REPORTS_DIR = "reporter/test/test-reports"
 
 
+@pytest.fixture(autouse=True)
+def bypass_eth_call_cache(monkeypatch):
+    """Contract reads in tests are mocked, so keep their results out of the local cache"""
+    monkeypatch.setattr(eth_call_cache, "bypass", True)
+
+
 @pytest.fixture
 def config() -> Config:
     return load_conf("reporter/test/stubs/config")
@@ -45,6 +52,11 @@ SKIP_REASON = (
     "API Calls disabled: set PYTEST_LIVE_CALLS_ENABLED=TRUE in .env to run this test"
 )
 
+BENCHMARK_DISABLED = os.environ.get("PYTEST_BENCHMARK_ENABLED") != "TRUE"
+BENCHMARK_SKIP_REASON = (
+    "Benchmarks disabled: set PYTEST_BENCHMARK_ENABLED=TRUE in .env to run them"
+)
+
 
 def mock_token_holders(monkeypatch, stub: str) -> None:
     with open(stub) as j:
@@ -72,3 +72,19 @@ def test_account_from_arv_staker():
     assert isinstance(account, Account)
     assert account.rewards == rewards
     assert account.state == state
+
+
+def test_addresses_are_interned(monkeypatch):
+    from reporter.models import types
+
+    hashed = []
+    keccak = types.keccak
+    monkeypatch.setattr(types, "keccak", lambda b: hashed.append(b) or keccak(b))
+
+    lower = "0x00000000219ab540356cbb839cbe05303d7705fa"
+    users = [User(address=a) for a in [lower, lower.upper().replace("0X", "0x")]]
+    delegate = Delegate(delegator=lower, delegate=users[0].address)
+
+    assert users[0].address == "0x00000000219ab540356cBB839Cbe05303d7705Fa"
+    assert all(a is users[0].address for a in [users[1].address, delegate.delegator])
+    assert len(hashed) == 1
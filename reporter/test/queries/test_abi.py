@@ -0,0 +1,45 @@
+from eth_abi import decode_abi, encode_abi
+from multicall import Call  # type: ignore
+
+from reporter.queries.abi import RawCall, decode_aggregate, encode_aggregate
+from reporter.queries.rpc import AGGREGATE_SELECTOR
+
+TARGET = "0x3E70FF09C8f53294FFd389a7fcF7276CC3d92e64"
+ACCOUNT = "0x9bc33f6155eFAcc290c3C50E9B5b24b668562732"
+
+
+def test_raw_call_encodes_like_call():
+    for signature, args in [
+        ("balanceOf(address)(uint256)", (ACCOUNT,)),
+        ("isClaimed(uint256,uint256)(bool)", (14, 1234)),
+        ("isRewardsDelegate(address,address)(bool)", (ACCOUNT, TARGET)),
+    ]:
+        expected = Call(TARGET, [signature, *args]).data
+        assert RawCall(TARGET, signature).encode(*args) == expected
+
+
+def test_raw_call_decodes_static_outputs():
+    lock = RawCall(TARGET, "lockOf(address)((uint192,uint32,uint32))")
+    output = encode_abi(["(uint192,uint32,uint32)"], [(10**18, 1680000000, 86400)])
+    assert lock.decode(output) == (10**18, 1680000000, 86400)
+
+    handled = RawCall(TARGET, "lockOf(address)((uint192,uint32,uint32))", list)
+    assert handled.decode(output) == [10**18, 1680000000, 86400]
+
+    claimed = RawCall(TARGET, "isClaimed(uint256,uint256)(bool)")
+    assert claimed.decode(encode_abi(["bool"], [True])) is True
+    # eg: a call to an address without code
+    assert claimed.decode(b"") is None
+
+
+def test_aggregate_matches_abi_codec():
+    calls = [(TARGET, b"\x01\x02\x03\x04" + bytes(32)), (ACCOUNT, b"\xff" * 70)]
+
+    encoded = encode_aggregate(AGGREGATE_SELECTOR, calls)
+    assert encoded[:4] == AGGREGATE_SELECTOR
+    (decoded,) = decode_abi(["(address,bytes)[]"], encoded[4:])
+    assert [(a.lower(), d) for a, d in decoded] == [(a.lower(), d) for a, d in calls]
+
+    outputs = [b"", bytes(32), b"\x01" * 65]
+    response = encode_abi(["uint256", "bytes[]"], [17000000, outputs])
+    assert decode_aggregate(response) == outputs
@@ -0,0 +1,86 @@
+import sys
+from decimal import Decimal
+
+import pytest
+
+from reporter.errors import SubgraphBehindError
+from reporter.models import Config
+from reporter.queries import RawCall, SnapshotReader, get_prv_total_supply
+
+TOKEN = "0x3E70FF09C8f53294FFd389a7fcF7276CC3d92e64"
+ACCOUNT = "0x9bc33f6155eFAcc290c3C50E9B5b24b668562732"
+
+SUPPLY = RawCall(TOKEN, "totalSupply()(uint256)")
+BALANCE = RawCall(TOKEN, "balanceOf(address)(uint256)")
+
+
+@pytest.fixture
+def multicalls(monkeypatch) -> list:
+    """Every multicall made, answering each read with its position in the batch"""
+    made: list = []
+
+    def multicall_raw(reads, block_id, name):
+        made.append((name, block_id, [key for key, *_ in reads]))
+        return {key: i for i, (key, *_) in enumerate(reads)}
+
+    monkeypatch.setattr("reporter.queries.block_snapshot.multicall_raw", multicall_raw)
+    return made
+
+
+def test_queued_reads_share_the_next_multicall(config: Config, multicalls: list):
+    reader = SnapshotReader(config)
+    reader.add("supply", SUPPLY)
+
+    assert reader.read([(ACCOUNT, BALANCE, (ACCOUNT,))], name="balances") == {
+        ACCOUNT: 1
+    }
+    assert reader.get("supply") == 0
+    assert len(multicalls) == 1
+
+    name, block, _ = multicalls[0]
+    assert (name, block) == ("balances", config.block_snapshot)
+
+
+def test_queued_reads_are_fetched_on_their_own_if_needed(
+    config: Config, multicalls: list
+):
+    reader = SnapshotReader(config)
+    reader.add("supply", SUPPLY)
+
+    assert reader.get("supply") == 0
+    assert reader.get("supply") == 0
+    assert len(multicalls) == 1
+
+
+def test_subgraphs_must_reach_the_snapshot_block(config: Config, monkeypatch):
+    heads = {"https://staking": config.block_snapshot, "https://gov": 1}
+    checked = []
+
+    def post_graphql(url, params, access_path):
+        checked.append(url)
+        return {"block": {"number": heads[url]}}
+
+    monkeypatch.setattr("reporter.queries.block_snapshot.post_graphql", post_graphql)
+    reader = SnapshotReader(config)
+
+    reader.check_subgraphs("https://staking")
+    reader.check_subgraphs("https://staking")
+    assert checked == ["https://staking"]
+
+    with pytest.raises(SubgraphBehindError):
+        reader.check_subgraphs("https://gov")
+
+
+def test_total_supply_at_a_block_number(monkeypatch):
+    made = []
+
+    def multicall_raw(reads, block_id, name):
+        made.append((block_id, name))
+        return {key: 10**21 for key, *_ in reads}
+
+    # the package re-exports the `total_supply` function under the module's name
+    module = sys.modules["reporter.queries.total_supply"]
+    monkeypatch.setattr(module, "multicall_raw", multicall_raw)
+
+    assert get_prv_total_supply(17000000) == Decimal(10**21)
+    assert made == [(17000000, "prv_total_supply")]
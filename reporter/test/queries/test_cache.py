@@ -0,0 +1,95 @@
+import json
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from reporter.queries.cache import ResponseCache
+from reporter.queries.common import graphql_iterate_query
+
+
+@pytest.fixture
+def cache(tmp_path) -> ResponseCache:
+    return ResponseCache(str(tmp_path), max_bytes=100)
+
+
+def test_roundtrip(cache: ResponseCache):
+    key = cache.key("url", "query", {"block": 1})
+
+    assert cache.get(key) is None
+    cache.set(key, b"body")
+    assert cache.get(key) == b"body"
+
+
+def test_key_ignores_whitespace_and_variable_order():
+    a = ResponseCache.key("url", "query { a  b }", {"block": 1, "cursor": ""})
+    b = ResponseCache.key("url", "query {\n  a\n  b\n}", {"cursor": "", "block": 1})
+    c = ResponseCache.key("url", "query { a b }", {"cursor": "", "block": 2})
+
+    assert a == b
+    assert a != c
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=130)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.set(key, b"x" * 40)
+        os.utime(cache.path(key), (i, i))
+
+    # reading 'a' makes 'b' the oldest entry
+    cache.get("a")
+    cache.set("d", b"x" * 40)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.size() <= 130
+
+
+def test_bypass(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=100, bypass=True)
+    cache.set("a", b"body")
+
+    assert cache.get("a") is None
+    assert cache.entries() == []
+
+
+def test_cacheable_queries_skip_the_network(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "reporter.queries.common.graphql_cache",
+        ResponseCache(str(tmp_path), max_bytes=1000),
+    )
+
+    def page(_, params, hedge=False):
+        balances = [{"id": "1"}] if params["variables"]["skip"] == 0 else []
+        return json.dumps({"data": {"balances": balances}}).encode()
+
+    post = Mock(side_effect=page)
+    monkeypatch.setattr("reporter.queries.common.default_transport.post", post)
+
+    params = dict(query="query { balances }", variables={"skip": 0, "block": 1})
+    for _ in range(2):
+        results = graphql_iterate_query(
+            "url",
+            ["balances"],
+            dict(params, variables=dict(params["variables"])),
+            cacheable=True,
+        )
+        assert results == [{"id": "1"}]
+
+    # first run fetches the page plus the empty page ending pagination
+    assert post.call_count == 2
+
+
+def test_errors_are_not_cached(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), max_bytes=1000)
+    monkeypatch.setattr("reporter.queries.common.graphql_cache", cache)
+    monkeypatch.setattr(
+        "reporter.queries.common.default_transport.post",
+        lambda *_: json.dumps({"errors": [{"message": "indexing"}]}).encode(),
+    )
+
+    with pytest.raises(Exception):
+        graphql_iterate_query(
+            "url", ["balances"], dict(query="q", variables={}), cacheable=True
+        )
+    assert cache.entries() == []
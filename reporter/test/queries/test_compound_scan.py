@@ -0,0 +1,92 @@
+import pytest
+
+from reporter.env import MULTICALL
+from reporter.models import MerkleRecipient, MerkleTree
+from reporter.queries import compound
+from reporter.queries.compound import (
+    CompoundScan,
+    compound_scan,
+    get_unclaimed_delegated_recipients,
+)
+
+ADDRESSES = [f"0x{i:040x}" for i in range(1, 11)]
+DELEGATORS = ADDRESSES[:3]
+CLAIMED = ADDRESSES[:1]
+
+
+class MockConf:
+    block_snapshot = 42
+
+    def distributor(self, token):
+        return "0x0000000000000000000000000000000000000abc"
+
+
+def mock_tree() -> MerkleTree:
+    recipients = {
+        address: MerkleRecipient(
+            windowIndex=0,
+            accountIndex=i,
+            rewards="1",
+            token="0x0000000000000000000000000000000000000001",
+            proof=[],
+        )
+        for i, address in enumerate(ADDRESSES)
+    }
+    return MerkleTree.construct(recipients=recipients)
+
+
+def mock_multicall(monkeypatch) -> list[tuple[str, int]]:
+    """Answers both checks for the test recipients, recording each call made"""
+    requested = []
+
+    def multicall_raw(reads, block_id, name):
+        results = {}
+        for key, call, args in reads:
+            address = key[1] if isinstance(key, tuple) else key
+            if call.signature.startswith("isRewardsDelegate"):
+                requested.append(("delegated", address))
+                results[key] = address in DELEGATORS
+            else:
+                requested.append(("claimed", address))
+                results[key] = address in CLAIMED
+        return results
+
+    monkeypatch.setattr(compound, "multicall_raw", multicall_raw)
+    return requested
+
+
+@pytest.mark.parametrize("scan", [CompoundScan.TWO_PHASE, CompoundScan.SINGLE_PASS])
+def test_scans_find_the_same_recipients(monkeypatch, scan):
+    requested = mock_multicall(monkeypatch)
+    monkeypatch.setattr(compound.COMPOUND, "SCAN", scan.value)
+
+    recipients = get_unclaimed_delegated_recipients(mock_tree(), MockConf(), "ARV")  # type: ignore
+
+    assert list(recipients) == DELEGATORS[1:]
+    claims_checked = [a for check, a in requested if check == "claimed"]
+    if scan == CompoundScan.TWO_PHASE:
+        # claims are only checked for recipients delegating to the multisig
+        assert claims_checked == DELEGATORS
+    else:
+        assert claims_checked == ADDRESSES
+
+
+def test_compound_scan_auto(monkeypatch):
+    monkeypatch.setattr(MULTICALL, "ENGINE", "aggregate")
+    monkeypatch.setattr(MULTICALL, "BATCH_SIZE", 20)
+    recipients = {address: None for address in ADDRESSES}
+
+    assert compound_scan(recipients, CompoundScan.AUTO) == CompoundScan.SINGLE_PASS  # type: ignore
+    monkeypatch.setattr(MULTICALL, "BATCH_SIZE", 10)
+    assert compound_scan(recipients, CompoundScan.AUTO) == CompoundScan.TWO_PHASE  # type: ignore
+    assert compound_scan(recipients, CompoundScan.SINGLE_PASS) == CompoundScan.SINGLE_PASS  # type: ignore
+
+
+def test_compound_scan_auto_uses_the_engine_batch_size(monkeypatch):
+    monkeypatch.setattr(MULTICALL, "ENGINE", "batch")
+    monkeypatch.setattr(MULTICALL, "BATCH_SIZE", 20)
+    monkeypatch.setattr(MULTICALL, "RPC_BATCH_SIZE", 10)
+    recipients = {address: None for address in ADDRESSES}
+
+    # 20 reads fit in an aggregate call, but the batch engine sends them in two
+    assert compound_scan(recipients, CompoundScan.AUTO) == CompoundScan.TWO_PHASE  # type: ignore
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from reporter.errors import EmptyQueryError
+from reporter.queries.common import extract_nested_graphql
+from reporter.queries.decoder import GraphQLDecoder, compile_access_path
+
+URL = "https://graphql.example.com"
+
+
+def holders_page() -> dict:
+    return {
+        "data": {
+            "erc20Contract": {
+                "decimals": 18,
+                "id": "0xtoken",
+                "name": 'A "quoted" {name} [with] brackets\\',
+                "totalSupply": {"value": "1.5", "valueExact": "1500000000000000000"},
+                "balances": [
+                    {"id": "1", "account": {"id": "0x1"}, "valueExact": "10"},
+                    {"id": "2", "account": None, "valueExact": "-1e3"},
+                ],
+            }
+        }
+    }
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_matches_full_decode(indent):
+    response = holders_page()
+    body = json.dumps(response, indent=indent).encode()
+    path = ["erc20Contract", "balances"]
+
+    assert GraphQLDecoder(tuple(path)).decode(URL, body) == extract_nested_graphql(
+        response, path
+    )
+
+
+def test_skips_members_after_the_target():
+    body = json.dumps({"data": {"votes": [{"id": "a"}], "other": {"x": [1, 2]}}})
+
+    assert GraphQLDecoder(("votes",)).decode(URL, body) == [{"id": "a"}]
+
+
+def test_missing_path():
+    body = json.dumps({"data": {"erc20Contract": None}})
+
+    with pytest.raises(KeyError):
+        GraphQLDecoder(("erc20Contract", "balances")).decode(URL, body)
+
+
+@pytest.mark.parametrize(
+    "response",
+    [None, {}, {"data": None}, {"errors": [{"message": "bad"}], "data": None}],
+)
+def test_empty_or_error_responses(response):
+    with pytest.raises(EmptyQueryError):
+        GraphQLDecoder(("votes",)).decode(URL, json.dumps(response))
+
+
+def test_errors_after_data():
+    body = json.dumps({"data": {"votes": []}, "errors": [{"message": "indexing"}]})
+
+    with pytest.raises(EmptyQueryError, match="indexing"):
+        GraphQLDecoder(("votes",)).decode(URL, body)
+
+
+def test_decoders_are_compiled_once():
+    assert compile_access_path(("a", "b")) is compile_access_path(("a", "b"))
@@ -1,6 +1,7 @@
 import pytest
 
-from reporter.queries import get_locks, get_arv_stakers
+from reporter.queries import get_locks, get_arv_stakers, get_locks_and_boosted_balances
+from reporter.queries.arv_stakers import to_lock
 from reporter.config import load_conf
 from reporter.test.conftest import LIVE_CALLS_DISABLED, SKIP_REASON
 
@@ -12,3 +13,33 @@ def test_get_locks():
     stakers = get_arv_stakers(conf)
     addresses = [s.address for s in stakers]
     get_locks(addresses, conf)
+
+
+def test_get_locks_and_boosted_balances(monkeypatch):
+    addresses = [f"0x{i:040x}" for i in range(1, 4)]
+    requested = {}
+
+    def multicall_raw(reads, block_id, name):
+        requested.update(
+            block_id=block_id,
+            functions=[call.signature.split("(")[0] for _, call, _ in reads],
+        )
+        results = {}
+        for (kind, address), call, args in reads:
+            assert args == (address,)
+            results[(kind, address)] = (
+                to_lock([1, 2, 3]) if kind == "lock" else int(address, 16)
+            )
+        return results
+
+    monkeypatch.setattr("reporter.queries.arv_stakers.multicall_raw", multicall_raw)
+
+    locks, boosts = get_locks_and_boosted_balances(addresses, 42)
+
+    assert requested["block_id"] == 42
+    # both reads of a staker are interleaved into the same pass
+    assert requested["functions"][:2] == ["lockOf", "balanceOf"]
+    assert len(requested["functions"]) == 2 * len(addresses)
+    assert list(locks) == addresses
+    assert locks[addresses[0]].lockDuration == 3
+    assert boosts == {a: int(a, 16) for a in addresses}
@@ -0,0 +1,81 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from reporter.errors import ReplayMissError
+from reporter.queries.recording import Recording, TransportMode, transport_mode
+from reporter.queries.transport import HTTPTransport
+
+GRAPHQL_URL = "https://hub.snapshot.org/graphql"
+RPC_URL = "https://rpc.example.com"
+
+
+def rpc_request(id: int) -> bytes:
+    return json.dumps(
+        {"jsonrpc": "2.0", "method": "eth_call", "params": [{"to": "0x1"}], "id": id}
+    ).encode()
+
+
+def test_record_then_replay(tmp_path):
+    archive = str(tmp_path / "inputs.json.gz")
+
+    recorder = HTTPTransport()
+    for url in [GRAPHQL_URL, RPC_URL]:
+        recorder.session(url).post = Mock(
+            side_effect=lambda url, data, **_: Mock(
+                status_code=200,
+                content=(
+                    b'{"jsonrpc": "2.0", "id": 1, "result": "0x2a"}'
+                    if url == RPC_URL
+                    else b'{"data": {"votes": []}}'
+                ),
+            )
+        )
+
+    with transport_mode(TransportMode.RECORD, archive, recorder):
+        recorder.post(GRAPHQL_URL, {"query": "{ votes }", "variables": {}})
+        recorder.post(RPC_URL, rpc_request(1))
+
+    replayer = HTTPTransport()
+    replayer.session = Mock(side_effect=AssertionError("network used in replay"))
+
+    with transport_mode(TransportMode.REPLAY, archive, replayer):
+        assert replayer.post(GRAPHQL_URL, {"query": "{ votes }", "variables": {}}) == (
+            b'{"data": {"votes": []}}'
+        )
+        # the request id differs from the recorded one, the response must match it
+        response = json.loads(replayer.post(RPC_URL, rpc_request(7)))
+        assert response == {"jsonrpc": "2.0", "id": 7, "result": "0x2a"}
+
+        with pytest.raises(ReplayMissError):
+            replayer.post(GRAPHQL_URL, {"query": "{ other }", "variables": {}})
+
+    assert replayer.recording is None
+
+
+def test_recordings_accumulate_per_epoch(tmp_path):
+    archive = str(tmp_path / "inputs.json.gz")
+
+    first = Recording(archive, TransportMode.RECORD)
+    first.record(GRAPHQL_URL, b'{"query": "a"}', b"{}")
+    first.save()
+
+    second = Recording(archive, TransportMode.RECORD)
+    second.record(GRAPHQL_URL, b'{"query": "b"}', b"{}")
+    second.save()
+
+    assert len(Recording(archive, TransportMode.REPLAY).responses) == 2
+
+
+def test_recording_bypasses_cache(tmp_path, monkeypatch):
+    cache, calls = Mock(bypass=False), Mock(bypass=False)
+    monkeypatch.setattr("reporter.queries.recording.graphql_cache", cache)
+    monkeypatch.setattr("reporter.queries.recording.eth_call_cache", calls)
+
+    with transport_mode(TransportMode.RECORD, str(tmp_path / "a.gz"), HTTPTransport()):
+        assert cache.bypass
+        assert calls.bypass
+
+    assert not cache.bypass
+    assert not calls.bypass
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+from eth_abi import decode_abi, encode_abi
+from multicall import Call  # type: ignore
+
+from reporter.queries.cache import ResponseCache
+from reporter.queries.rpc import Engine, multicall
+
+ADDRESSES = [f"0x{i:040x}" for i in range(1, 8)]
+
+
+def mock_node(monkeypatch, max_calls: int) -> list[int]:
+    """
+    An RPC node answering `balanceOf(address)` with the address as an integer,
+    that reverts any `aggregate` or rejects any JSON-RPC batch of more than `max_calls` calls
+    """
+    batches: list[int] = []
+
+    def post(url, body, hedge=False):
+        request = json.loads(body)
+        if isinstance(request, list):
+            batches.append(len(request))
+            if len(request) > max_calls:
+                error = {"code": -32600, "message": "batch too large"}
+                return json.dumps(
+                    {"jsonrpc": "2.0", "id": None, "error": error}
+                ).encode()
+            return json.dumps([balance_of(r) for r in request]).encode()
+
+        response = {"jsonrpc": "2.0", "id": request["id"]}
+        if request["method"] == "eth_chainId":
+            response["result"] = "0x1"
+            return json.dumps(response).encode()
+
+        data = bytes.fromhex(request["params"][0]["data"][2:])
+        (calls,) = decode_abi(["(address,bytes)[]"], data[4:])
+        batches.append(len(calls))
+        if len(calls) > max_calls:
+            response["error"] = {"code": -32000, "message": "out of gas"}
+        else:
+            outputs = [encode_abi(["uint256"], [int(a, 16)]) for a, _ in calls]
+            encoded = encode_abi(["uint256", "bytes[]"], [1, outputs])
+            response["result"] = "0x" + encoded.hex()
+        return json.dumps(response).encode()
+
+    monkeypatch.setattr("reporter.queries.provider.default_transport.post", post)
+    return batches
+
+
+def balance_of(request: dict) -> dict:
+    """A plain `balanceOf(address)` eth_call"""
+    account = int(request["params"][0]["data"][-40:], 16)
+    result = "0x" + encode_abi(["uint256"], [account]).hex()
+    return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+
+def balance_calls() -> list[Call]:
+    return [Call(a, ["balanceOf(address)(uint256)", a], [[a, None]]) for a in ADDRESSES]
+
+
+def test_multicall_batches(monkeypatch):
+    batches = mock_node(monkeypatch, max_calls=3)
+
+    results = multicall(balance_calls(), 1, name="balances", batch_size=3)
+
+    assert results == {a: int(a, 16) for a in ADDRESSES}
+    assert sorted(batches) == [1, 3, 3]
+
+
+def test_multicall_halves_rejected_batches(monkeypatch):
+    batches = mock_node(monkeypatch, max_calls=2)
+
+    results = multicall(balance_calls(), 1, name="balances", batch_size=7)
+
+    # results keep the order of the calls, however the batches were split
+    assert list(results.items()) == [(a, int(a, 16)) for a in ADDRESSES]
+    assert batches == [7, 3, 1, 2, 4, 2, 2]
+
+
+def test_multicall_raises_if_a_single_call_fails(monkeypatch):
+    mock_node(monkeypatch, max_calls=0)
+
+    with pytest.raises(ValueError):
+        multicall(balance_calls()[:2], 1, name="balances")
+
+
+def test_eth_calls_at_a_block_are_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "reporter.queries.provider.eth_call_cache",
+        ResponseCache(str(tmp_path), max_bytes=10_000),
+    )
+    batches = mock_node(monkeypatch, max_calls=7)
+
+    first = multicall(balance_calls(), 1, name="balances")
+    second = multicall(balance_calls(), 1, name="balances")
+    assert first == second
+    assert batches == [7]
+
+    # a different block, or the latest one, goes to the node
+    multicall(balance_calls(), 2, name="balances")
+    multicall(balance_calls(), "latest", name="balances")  # type: ignore
+    assert batches == [7, 7, 7]
+
+
+def test_batch_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "reporter.queries.provider.eth_call_cache",
+        ResponseCache(str(tmp_path), max_bytes=10_000),
+    )
+    batches = mock_node(monkeypatch, max_calls=2)
+
+    results = multicall(
+        balance_calls(), 1, name="balances", batch_size=4, engine=Engine.BATCH
+    )
+    assert list(results.items()) == [(a, int(a, 16)) for a in ADDRESSES]
+    # the batch of 4 is rejected and halved, the batch of 3 is split into 1 and 2
+    assert sorted(batches) == [1, 2, 2, 2, 3, 4]
+
+    # cached calls are left out of the batch
+    batches.clear()
+    multicall(balance_calls(), 1, name="balances", batch_size=4, engine=Engine.BATCH)
+    assert batches == []
@@ -0,0 +1,115 @@
+import json
+import threading
+
+import pytest
+from eth_abi import encode_abi
+from multicall import Call  # type: ignore
+
+from reporter.queries import telemetry as telemetry_module
+from reporter.queries.common import graphql_iterate_sharded, Pagination
+from reporter.queries.rpc import multicall
+from reporter.queries.telemetry import NetworkTelemetry, network_telemetry
+
+
+@pytest.fixture(autouse=True)
+def fresh_telemetry():
+    network_telemetry.reset()
+    yield
+    network_telemetry.reset()
+
+
+def test_measure_attributes_records():
+    telemetry = NetworkTelemetry()
+    with telemetry.measure("votes"):
+        telemetry.record(calls=2, bytes_in=10)
+        # nested queries count towards the outer one
+        with telemetry.measure("inner"):
+            telemetry.record(pages=1)
+
+    stats = telemetry.to_dict()
+    assert list(stats) == ["votes"]
+    assert stats["votes"]["calls"] == 2
+    assert stats["votes"]["pages"] == 1
+    assert stats["votes"]["wall_time"] > 0
+
+
+def test_measure_counts_errors():
+    telemetry = NetworkTelemetry()
+    with pytest.raises(ValueError):
+        with telemetry.measure("votes"):
+            raise ValueError()
+
+    assert telemetry.to_dict()["votes"]["errors"] == 1
+
+
+def test_sharded_queries_are_attributed_across_threads(monkeypatch):
+    def post(url, payload, hedge=False):
+        network_telemetry.record(calls=1)
+        assert threading.current_thread() is not threading.main_thread()
+        return json.dumps({"data": {"balances": []}}).encode()
+
+    monkeypatch.setattr("reporter.queries.common.default_transport.post", post)
+
+    graphql_iterate_sharded(
+        "https://graphql.example.com/holders",
+        ["balances"],
+        {"query": "query {}", "variables": {"cursor": ""}},
+        [{"prefix": "0x0"}, {"prefix": "0x1"}],
+        pagination=Pagination.CURSOR,
+        name="holders",
+    )
+
+    stats = network_telemetry.to_dict()
+    assert list(stats) == ["holders"]
+    assert stats["holders"]["calls"] == 2
+    assert stats["holders"]["pages"] == 2
+
+
+def test_multicall_through_transport(monkeypatch):
+    address = "0x0000000000000000000000000000000000000001"
+    balance = encode_abi(["uint256"], [42])
+    requests = []
+
+    def post(url, body, hedge=False):
+        request = json.loads(body)
+        requests.append(request["method"])
+        if request["method"] == "eth_chainId":
+            result = "0x1"
+        else:
+            result = "0x" + encode_abi(["uint256", "bytes[]"], [1, [balance]]).hex()
+        response = {"jsonrpc": "2.0", "id": request["id"], "result": result}
+        network_telemetry.record(calls=1, bytes_in=len(json.dumps(response)))
+        return json.dumps(response).encode()
+
+    monkeypatch.setattr("reporter.queries.provider.default_transport.post", post)
+
+    calls = [Call(address, ["balanceOf(address)(uint256)", address], [[address, None]])]
+    assert multicall(calls, 1, name="balances") == {address: 42}
+    assert "eth_call" in requests
+    assert network_telemetry.to_dict()["balances"]["pages"] == 1
+
+
+def test_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        telemetry_module.TELEMETRY, "PROMETHEUS_TEXTFILE_DIR", str(tmp_path)
+    )
+    telemetry = NetworkTelemetry()
+    with telemetry.measure("arv_locks"):
+        telemetry.record(calls=1, bytes_out=100)
+    telemetry.write(str(tmp_path / "perf"), "2023-7")
+
+    # a later run in the same epoch keeps the earlier queries
+    later = NetworkTelemetry()
+    with later.measure("prv_depositors"):
+        later.record(calls=3)
+    later.write(str(tmp_path / "perf"), "2023-7")
+
+    report = json.loads((tmp_path / "perf" / "network.json").read_text())
+    assert set(report["queries"]) == {"arv_locks", "prv_depositors"}
+
+    textfile = (tmp_path / "auxo_reporter.prom").read_text()
+    assert (
+        'auxo_reporter_network_calls{epoch="2023-7",query="prv_depositors"} 3'
+        in textfile
+    )
+    assert textfile == (tmp_path / "perf" / "network.prom").read_text()
@@ -0,0 +1,139 @@
+import time
+
+import pytest
+import requests
+from unittest.mock import Mock
+
+from reporter.errors import TransportError
+from reporter.queries.telemetry import network_telemetry
+from reporter.queries.transport import EndpointPool, HTTPTransport, default_pool_size
+
+
+def mock_response(status: int, content: bytes = b"{}", headers={}) -> Mock:
+    return Mock(status_code=status, content=content, headers=headers)
+
+
+@pytest.fixture
+def transport(monkeypatch) -> HTTPTransport:
+    monkeypatch.setattr("reporter.queries.transport.time.sleep", lambda _: None)
+    return HTTPTransport(timeout=5, max_retries=3, backoff=0.1, max_backoff=1)
+
+
+def test_reuses_session_per_host(transport: HTTPTransport):
+    a = transport.session("https://api.thegraph.com/subgraphs/name/a")
+    b = transport.session("https://api.thegraph.com/subgraphs/name/b")
+    c = transport.session("https://hub.snapshot.org/graphql")
+
+    assert a is b
+    assert a is not c
+
+
+def test_retries_transient_errors(transport: HTTPTransport, monkeypatch):
+    url = "https://hub.snapshot.org/graphql"
+    post = Mock(
+        side_effect=[
+            mock_response(502),
+            requests.ConnectionError("reset"),
+            mock_response(200, b'{"data": {}}'),
+        ]
+    )
+    monkeypatch.setattr(transport.session(url), "post", post)
+
+    assert transport.post(url, {"query": "{}"}) == b'{"data": {}}'
+    assert post.call_count == 3
+    assert post.call_args.kwargs["timeout"] == 5
+
+
+def test_does_not_retry_client_errors(transport: HTTPTransport, monkeypatch):
+    url = "https://hub.snapshot.org/graphql"
+    post = Mock(return_value=mock_response(400, b'{"errors": []}'))
+    monkeypatch.setattr(transport.session(url), "post", post)
+
+    assert transport.post(url, {"query": "{}"}) == b'{"errors": []}'
+    assert post.call_count == 1
+
+
+def test_gives_up_after_max_retries(transport: HTTPTransport, monkeypatch):
+    url = "https://hub.snapshot.org/graphql"
+    post = Mock(return_value=mock_response(503))
+    monkeypatch.setattr(transport.session(url), "post", post)
+
+    with pytest.raises(TransportError):
+        transport.post(url, {"query": "{}"})
+    assert post.call_count == 4
+
+
+def test_backoff_is_bounded(transport: HTTPTransport):
+    assert all(0 <= transport.delay(attempt) <= 1 for attempt in range(20))
+    assert transport.delay(0, retry_after="120") == 1
+
+
+PRIMARY = "https://a.example/graphql"
+SECONDARY = "https://b.example/graphql"
+ENDPOINTS = f"{PRIMARY}, {SECONDARY}"
+
+
+def test_endpoints_are_ranked_by_health():
+    pool = EndpointPool(ENDPOINTS, cooldown=60)
+    a, b = pool.endpoints
+    assert pool.ranked() == [a, b]
+
+    a.failure()
+    assert pool.ranked() == [b, a]
+
+    a.success(0.5)
+    b.success(0.1)
+    assert pool.ranked() == [b, a]
+
+
+def test_fails_over_without_backing_off(transport: HTTPTransport, monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr("reporter.queries.transport.time.sleep", sleeps.append)
+    down = Mock(return_value=mock_response(503))
+    up = Mock(return_value=mock_response(200, b'{"data": {}}'))
+    monkeypatch.setattr(transport.session(PRIMARY), "post", down)
+    monkeypatch.setattr(transport.session(SECONDARY), "post", up)
+
+    assert transport.post(ENDPOINTS, {"query": "{}"}) == b'{"data": {}}'
+    assert transport.post(ENDPOINTS, {"query": "{}"}) == b'{"data": {}}'
+    # the failing endpoint is skipped while it cools down
+    assert down.call_count == 1
+    assert up.call_count == 2
+    assert sleeps == []
+
+
+def test_hedges_slow_requests(monkeypatch):
+    transport = HTTPTransport(timeout=5, hedge=True)
+    first, _ = transport.pool(ENDPOINTS).endpoints
+    for _ in range(20):
+        first.success(0.01)
+
+    def slow(*args, **kwargs):
+        time.sleep(0.5)
+        return mock_response(200, b"slow")
+
+    slow_post = Mock(side_effect=slow)
+    fast_post = Mock(return_value=mock_response(200, b"fast"))
+    monkeypatch.setattr(transport.session(PRIMARY), "post", slow_post)
+    monkeypatch.setattr(transport.session(SECONDARY), "post", fast_post)
+
+    with network_telemetry.measure("hedged"):
+        assert transport.post(ENDPOINTS, {"query": "{}"}, hedge=True) == b"fast"
+    assert network_telemetry.queries["hedged"].hedges == 1
+
+    # the second endpoint answered faster so it is now preferred, requests that may change are sent once
+    assert transport.post(ENDPOINTS, {"query": "{}"}) == b"fast"
+    assert (slow_post.call_count, fast_post.call_count) == (1, 2)
+    transport.close()
+
+
+def test_default_pool_covers_shards_multicalls_and_hedges(monkeypatch):
+    monkeypatch.setattr("reporter.queries.transport.GRAPHQL.CONCURRENCY", 16)
+    monkeypatch.setattr("reporter.queries.transport.MULTICALL.CONCURRENCY", 4)
+    monkeypatch.setattr("reporter.queries.transport.MULTICALL.RPC_CONCURRENCY", 6)
+
+    monkeypatch.setattr("reporter.queries.transport.HTTP.HEDGE", False)
+    assert default_pool_size() == 22
+
+    monkeypatch.setattr("reporter.queries.transport.HTTP.HEDGE", True)
+    assert default_pool_size() == 44
@@ -27,7 +27,7 @@ def test_init_account_rewards(ADDRESSES, config):
             rewards="0",
         ),
     ]
-    voters = ADDRESSES[0]
+    voters = [ADDRESSES[0]]
 
     accounts = init_account_rewards(stakers, voters, config)
 
@@ -65,6 +65,8 @@ def test_tokens_by_status(ADDRESSES, config):
     assert stats.total == "300"
     assert stats.active == "100"
     assert stats.inactive == "200"
+    assert (stats.active_accounts, stats.inactive_accounts) == (1, 1)
+    assert (stats.balances.min, stats.balances.max) == ("100", "200")
 
 
 def test_distribute(ADDRESSES, config):
@@ -80,7 +82,7 @@ def test_distribute(ADDRESSES, config):
             rewards="0",
         ),
     ]
-    voters = ADDRESSES[0]
+    voters = [ADDRESSES[0]]
     distribution, summary, token_stats = distribute(config, stakers, voters)
 
     assert all(isinstance(acc, Account) for acc in distribution)
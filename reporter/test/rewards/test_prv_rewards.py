@@ -11,7 +11,12 @@ from reporter.models import (
     RedistributionWeight,
     RedistributionContainer,
 )
-from reporter.rewards import prv_active_rewards, transfer_redistribution, redistribute
+from reporter.rewards import (
+    compute_prv_token_stats,
+    prv_active_rewards,
+    transfer_redistribution,
+    redistribute,
+)
 
 getcontext().prec = 42
 
@@ -175,3 +180,56 @@ def test_redistribute(config: Config, ADDRESSES):
     assert updated_accounts[2].rewards.amount == "25"
     assert updated_accounts[2].notes == ["Transfer of 25"]
     assert updated_accounts[2].state == AccountState.INACTIVE
+
+
+def test_redistribute_shares_unchanged_accounts(config: Config, ADDRESSES):
+    accounts = [
+        Account(
+            address=address,
+            token=PRV(amount="10"),
+            rewards=config.reward_token(amount="100"),
+            state=AccountState.ACTIVE,
+            notes=["active reward of 100"],
+        )
+        for address in ADDRESSES[:2]
+    ]
+    before = [a.dict() for a in accounts]
+    transfers = [
+        RedistributionWeight(
+            address=ADDRESSES[0],
+            rewards="50",
+            option=RedistributionOption.TRANSFER,
+            weight=1,
+        )
+    ] * 3
+    container = RedistributionContainer(redistributions=transfers)
+
+    updated = redistribute(accounts, container, config)
+
+    # the original accounts are untouched, and the account without a transfer isn't copied
+    assert [a.dict() for a in accounts] == before
+    assert updated[1] is accounts[1]
+    assert updated[0].rewards.amount == "250"
+    assert updated[0].notes == ["active reward of 100"] + ["Transfer of 50"] * 3
+    assert updated[0].token is accounts[0].token
+
+
+def test_compute_prv_token_stats(config: Config, ADDRESSES):
+    accounts = [
+        Account(
+            address=address,
+            token=PRV(amount=str(amount)),
+            rewards=config.reward_token(amount="0"),
+            state=AccountState.ACTIVE,
+        )
+        for address, amount in zip(ADDRESSES, [40, 10, 30, 20])
+    ]
+
+    stats = compute_prv_token_stats(accounts, Decimal(150))
+
+    # supply not held by the stakers counts as inactive
+    assert (stats.total, stats.active, stats.inactive) == ("150", "100", "50")
+    assert (stats.accounts, stats.active_accounts, stats.inactive_accounts) == (4, 4, 0)
+    assert (stats.balances.min, stats.balances.max) == ("10", "40")
+    assert stats.balances.percentiles["p50"] == "20"
+    assert stats.balances.percentiles["p90"] == "40"
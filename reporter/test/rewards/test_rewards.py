@@ -12,6 +12,7 @@ from reporter.queries import (
 from eth_utils import to_checksum_address
 from reporter.models import OnChainVote, Account, AccountState, Delegate, Vote
 from reporter import utils
+from reporter.rewards import pro_rata_rewards
 from reporter.test.conftest import _addresses
 
 
@@ -44,10 +45,8 @@ def init_mocks(monkeypatch):
     https://stackoverflow.com/questions/31306080/pytest-monkeypatch-isnt-working-on-imported-function
     """
     monkeypatch.setattr(
-        "reporter.queries.common.graphql_iterate_query",
-        lambda url, access_path, params: mock_stakers["data"]["erc20Contract"][
-            "balances"
-        ],
+        "reporter.queries.arv_stakers.stream_token_hodlers",
+        lambda *_: mock_stakers["data"]["erc20Contract"]["balances"],
     )
 
     monkeypatch.setattr(
@@ -109,3 +108,19 @@ def sum_totals(distribution: list[Account]) -> Decimal:
     return functools.reduce(
         lambda acc, curr: acc + Decimal(curr.amount), account_rewards, Decimal(0)
     )
+
+
+def test_pro_rata_rewards_are_exact():
+    balances = [10**21, 3 * 10**21, 7, 2 * 10**21]
+    active = [True, True, True, False]
+    total = 10**20 + 1
+
+    rewards, dust = pro_rata_rewards(balances, active, total)
+
+    active_total = 4 * 10**21 + 7
+    assert rewards[:3] == [b * total // active_total for b in balances[:3]]
+    assert rewards[3] == 0
+    assert sum(rewards) + dust == total
+    assert 0 <= dust < 3
+
+    assert pro_rata_rewards([5, 5], [False, False], total) == ([0, 0], total)
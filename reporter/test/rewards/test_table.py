@@ -0,0 +1,60 @@
+from reporter.models import PRV, Account, AccountState
+from reporter.rewards import AccountTable, Note, compute_table_rewards
+
+
+def make_accounts(config, ADDRESSES) -> list[Account]:
+    return [
+        Account(
+            address=address,
+            token=PRV(amount=str(100 * (i + 1))),
+            rewards=config.reward_token(amount="0"),
+            state=AccountState.ACTIVE if i % 2 == 0 else AccountState.INACTIVE,
+            notes=["staked"],
+        )
+        for i, address in enumerate(ADDRESSES[:4])
+    ]
+
+
+def test_table_indexes_and_filters(config, ADDRESSES):
+    table = AccountTable.from_accounts(make_accounts(config, ADDRESSES))
+
+    assert len(table) == 4
+    assert ADDRESSES[2] in table
+    assert table.index[ADDRESSES[2]] == 2
+    assert list(table.rows(AccountState.ACTIVE)) == [0, 2]
+    assert list(table.rows()) == [0, 1, 2, 3]
+    assert table.tokens(AccountState.ACTIVE) == 400
+    assert table.tokens(AccountState.INACTIVE) == 600
+    assert table.tokens() == 1000
+
+
+def test_table_round_trips_accounts(config, ADDRESSES):
+    accounts = make_accounts(config, ADDRESSES)
+    table = AccountTable.from_accounts(accounts)
+
+    updated = table.copy()
+    updated.add_reward(1, 50, Note.TRANSFER)
+    updated.add_reward(1, 25, Note.ACTIVE_REWARD)
+
+    # the original table still gives back the same accounts
+    assert all(a is b for a, b in zip(table.to_accounts(), accounts))
+
+    rewarded = updated.to_accounts()
+    assert rewarded[0] is accounts[0]
+    assert rewarded[1].rewards.amount == "75"
+    assert rewarded[1].notes == ["staked", "Transfer of 50", "active reward of 25"]
+    assert rewarded[1].token is accounts[1].token
+    assert accounts[1].rewards.amount == "0"
+    assert accounts[1].notes == ["staked"]
+
+
+def test_table_rewards_report_rate_and_dust(config, ADDRESSES):
+    table = AccountTable.from_accounts(make_accounts(config, ADDRESSES))
+
+    rewarded, summary = compute_table_rewards(config.reward_token(amount="1001"), table)
+
+    # 1001 split across 400 active tokens gives 250.25 and 750.75, rounded down with 1 left over
+    assert rewarded.rewards == [250, 0, 750, 0]
+    assert summary.dust == "1"
+    assert summary.pro_rata == "2.5025"
+    assert sum(rewarded.rewards) + int(summary.dust) == 1001
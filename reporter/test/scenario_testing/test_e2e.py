@@ -62,24 +62,27 @@ def _read_mock(file_name, SCENARIO_NUMBER):
     return mock
 
 
-def init_e2e_arv_mocks(monkeypatch, read_mock: Callable):
-    # path to the input file
-    # get_token_hodlers
+def mock_subgraph_check(monkeypatch):
     monkeypatch.setattr(
-        "reporter.queries.arv_stakers.get_token_hodlers",
-        lambda *_: read_mock("mock_arv.json")["data"]["erc20Contract"]["balances"],
+        "reporter.queries.block_snapshot.SnapshotReader.check_subgraphs",
+        lambda *_: None,
     )
 
-    # get locks
+
+def init_e2e_arv_mocks(monkeypatch, read_mock: Callable):
+    mock_subgraph_check(monkeypatch)
+
+    # path to the input file
+    # stream_token_hodlers
     monkeypatch.setattr(
-        "reporter.queries.arv_stakers.get_locks",
-        lambda *_: read_mock("arv_locks.json"),
+        "reporter.queries.arv_stakers.stream_token_hodlers",
+        lambda *_: read_mock("mock_arv.json")["data"]["erc20Contract"]["balances"],
     )
 
-    # get_boosted_lock
+    # get locks and boosted balances
     monkeypatch.setattr(
-        "reporter.queries.arv_stakers.get_boosted_lock",
-        lambda *_: read_mock("arv_boosted.json"),
+        "reporter.queries.arv_stakers.get_locks_and_boosted_balances",
+        lambda *_: (read_mock("arv_locks.json"), read_mock("arv_boosted.json")),
     )
 
     # get_offchain_votes
@@ -99,6 +102,8 @@ def init_e2e_arv_mocks(monkeypatch, read_mock: Callable):
 
 
 def init_e2e_prv_mocks(monkeypatch, read_mock: Callable, generate_users):
+    mock_subgraph_check(monkeypatch)
+
     # get_prv_total_supply
     monkeypatch.setattr(
         "reporter.run_prv.get_prv_total_supply",
@@ -0,0 +1,343 @@
+import argparse
+import json
+import re
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Callable, Optional
+
+from eth_abi import decode_abi, encode_abi  # type: ignore
+from eth_utils import function_signature_to_4byte_selector
+
+from reporter.config import load_conf
+from reporter.test.standin.state import Holder, SyntheticState
+
+"""
+A local stand-in for the subgraphs, Snapshot and the RPC node, serving `SyntheticState`.
+
+Only the shapes `reporter/queries` relies on are implemented: the GraphQL fields are found by name,
+their `first` and `skip` arguments (including aliased pages) and the query variables are applied,
+and every selected object is returned whole. JSON-RPC answers `eth_call` for the contract reads we make,
+either directly or inside a Multicall3 `aggregate`.
+
+Run it with `python -m reporter.test.standin.server --epoch reports/2023-7 --holders 10000`
+and export the printed endpoints to point the reporter at it.
+"""
+
+FIELD = re.compile(
+    r"(?:(\w+)\s*:\s*)?\b(balances|prvstakingBalances|votes|voteCasts)\s*\("
+)
+FIRST = re.compile(r"\bfirst\s*:\s*(\d+)")
+SKIP = re.compile(r"\bskip\s*:\s*(\d+)")
+
+# sorts after every hex digit, so `prefix + END` bounds all addresses starting with `prefix`
+END = "~"
+
+
+def selector(signature: str) -> bytes:
+    return function_signature_to_4byte_selector(signature)
+
+
+AGGREGATE = selector("aggregate((address,bytes)[])")
+BALANCE_OF = selector("balanceOf(address)")
+LOCK_OF = selector("lockOf(address)")
+ACTIVE_BALANCE = selector("getActiveBalanceForUser(address)")
+IS_CLAIMED = selector("isClaimed(uint256,uint256)")
+IS_REWARDS_DELEGATE = selector("isRewardsDelegate(address,address)")
+TOTAL_SUPPLY = selector("totalSupply()")
+
+
+class Revert(Exception):
+    pass
+
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+
+def address_arg(args: bytes, index: int = 0) -> str:
+    return "0x" + args[32 * index + 12 : 32 * (index + 1)].hex()
+
+
+def uint_arg(args: bytes, index: int = 0) -> int:
+    return int.from_bytes(args[32 * index : 32 * (index + 1)], "big")
+
+
+def int_arg(pattern: re.Pattern, args: str, default: int) -> int:
+    match = pattern.search(args)
+    return int(match.group(1)) if match else default
+
+
+class StandInState:
+    """Answers GraphQL fields and contract calls from a `SyntheticState`"""
+
+    def __init__(self, state: SyntheticState):
+        self.state = state
+        self.holder_ids = [h.address for h in state.accounts]
+        self.depositor_ids = [h.address for h in state.depositors]
+        self.vote_created = [v["created"] for v in state.snapshot_votes]
+        self._windows: dict[tuple[int, int], tuple[list[str], list[dict]]] = {}
+        self._lock = Lock()
+        self.handlers: dict[bytes, Callable[[bytes], bytes]] = {
+            BALANCE_OF: self.balance_of,
+            LOCK_OF: self.lock_of,
+            ACTIVE_BALANCE: self.active_balance,
+            IS_CLAIMED: self.is_claimed,
+            IS_REWARDS_DELEGATE: self.is_rewards_delegate,
+            TOTAL_SUPPLY: self.total_supply,
+        }
+
+    # ---------- GraphQL ----------
+
+    def graphql(self, request: dict) -> dict:
+        query, variables = request["query"], request.get("variables") or {}
+        data: dict[str, Any] = {}
+        if "_meta" in query:
+            data["_meta"] = {"block": {"number": self.state.block}}
+        for match in FIELD.finditer(query):
+            alias, name = match.group(1), match.group(2)
+            args = query[match.end() : query.index(")", match.end())]
+            # the graph returns 100 rows when `first` isn't given
+            first, skip = int_arg(FIRST, args, 100), int_arg(SKIP, args, 0)
+            rows = getattr(self, name)(variables, skip, first)
+
+            if name == "balances":
+                parent = data.setdefault("erc20Contract", self.token(variables))
+                parent[alias or name] = rows
+            else:
+                data[alias or name] = rows
+        return {"data": data}
+
+    def token(self, variables: dict) -> dict:
+        if variables.get("firstPage") is False:
+            return {}
+        supply = self.state.arv_total_supply
+        return {
+            "decimals": 18,
+            "id": variables.get("token"),
+            "name": "Auxo Active Reward Vault",
+            "symbol": "ARV",
+            "totalSupply": {"value": str(supply / 10**18), "valueExact": str(supply)},
+        }
+
+    @staticmethod
+    def window(lower: int, upper: int, skip: int, first: int) -> range:
+        """Indices of the page at `skip` rows into the matching rows `lower:upper`"""
+        start = min(lower + skip, upper)
+        return range(start, min(start + first, upper))
+
+    def by_prefix(self, ids: list[str], variables: dict) -> tuple[int, int]:
+        """Bounds of the addresses after the cursor and starting with the shard prefix"""
+        prefix = variables.get("prefix", "0x")
+        lower = bisect_left(ids, prefix)
+        upper = bisect_left(ids, prefix + END)
+        return max(lower, bisect_right(ids, variables.get("cursor") or "")), upper
+
+    def balances(self, variables: dict, skip: int, first: int) -> list[dict]:
+        lower, upper = self.by_prefix(self.holder_ids, variables)
+        accounts = self.state.accounts
+        return [
+            balance(accounts[i].address, accounts[i].arv)
+            for i in self.window(lower, upper, skip, first)
+        ]
+
+    def prvstakingBalances(self, variables: dict, skip: int, first: int) -> list[dict]:
+        lower, upper = self.by_prefix(self.depositor_ids, variables)
+        depositors = self.state.depositors
+        return [
+            balance(depositors[i].address, depositors[i].prv_deposit)
+            for i in self.window(lower, upper, skip, first)
+        ]
+
+    def votes(self, variables: dict, skip: int, first: int) -> list[dict]:
+        lower = bisect_left(self.vote_created, variables.get("cursor") or 0)
+        upper = bisect_right(self.vote_created, variables.get("created_lte", 2**63))
+        votes = self.state.snapshot_votes
+        return [votes[i] for i in self.window(lower, upper, skip, first)]
+
+    def voteCasts(self, variables: dict, skip: int, first: int) -> list[dict]:
+        ids, votes = self.vote_casts_between(
+            int(variables.get("timestamp_gt", 0)),
+            int(variables.get("timestamp_lte", 2**63)),
+        )
+        lower = bisect_right(ids, variables.get("cursor") or "")
+        return [votes[i] for i in self.window(lower, len(ids), skip, first)]
+
+    def vote_casts_between(self, gt: int, lte: int) -> tuple[list[str], list[dict]]:
+        """Governor votes in a time shard, filtered once and kept for the following pages"""
+        with self._lock:
+            if (gt, lte) not in self._windows:
+                votes = [
+                    v
+                    for v in self.state.governor_votes
+                    if gt < int(v["timestamp"]) <= lte
+                ]
+                self._windows[(gt, lte)] = ([v["id"] for v in votes], votes)
+            return self._windows[(gt, lte)]
+
+    # ---------- JSON-RPC ----------
+
+    def rpc(self, request: dict) -> dict:
+        response: dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            response["result"] = self.method(request["method"], request.get("params"))
+        except Revert as e:
+            response["error"] = {"code": 3, "message": f"execution reverted: {e}"}
+        except KeyError as e:
+            response["error"] = {"code": -32601, "message": f"unsupported: {e}"}
+        return response
+
+    def method(self, method: str, params: Any) -> Any:
+        if method == "eth_chainId":
+            return "0x1"
+        if method == "net_version":
+            return "1"
+        if method == "eth_blockNumber":
+            return hex(self.state.block)
+        if method == "eth_call":
+            data = bytes.fromhex(params[0]["data"][2:])
+            return "0x" + self.call(data).hex()
+        raise KeyError(method)
+
+    def call(self, data: bytes) -> bytes:
+        """Answer a single contract read, dispatched on the selector whatever the target"""
+        fn, args = data[:4], data[4:]
+        if fn == AGGREGATE:
+            (calls,) = decode_abi(["(address,bytes)[]"], args)
+            outputs = [self.call(calldata) for _, calldata in calls]
+            return encode_abi(["uint256", "bytes[]"], [self.state.block, outputs])
+
+        handler = self.handlers.get(fn)
+        if handler is None:
+            raise Revert(f"unknown selector 0x{fn.hex()}")
+        return handler(args)
+
+    def holder(self, args: bytes) -> Optional[Holder]:
+        return self.state.by_address.get(address_arg(args))
+
+    def balance_of(self, args: bytes) -> bytes:
+        """DecayOracle, the boosted balance"""
+        h = self.holder(args)
+        return word(h.boosted if h else 0)
+
+    def lock_of(self, args: bytes) -> bytes:
+        h = self.holder(args)
+        if h is None:
+            return word(0) * 3
+        return word(h.arv) + word(h.locked_at) + word(h.lock_duration)
+
+    def active_balance(self, args: bytes) -> bytes:
+        h = self.holder(args)
+        return word(h.prv_active if h else 0)
+
+    def is_claimed(self, args: bytes) -> bytes:
+        return word(self.state.is_claimed(uint_arg(args, 1)))
+
+    def is_rewards_delegate(self, args: bytes) -> bytes:
+        h = self.holder(args)
+        return word(bool(h and h.delegates))
+
+    def total_supply(self, _: bytes) -> bytes:
+        """PRV, the only token we read the supply of"""
+        return word(self.state.prv_total_supply)
+
+
+def balance(account: str, value: int) -> dict:
+    return {
+        "id": account,
+        "account": {"id": account},
+        "value": str(value / 10**18),
+        "valueExact": str(value),
+    }
+
+
+def handler(standin: StandInState) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        # keep-alive, so the reporter's pooled sessions are exercised as in production
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            if self.path == "/rpc":
+                if isinstance(request, list):
+                    response: Any = [standin.rpc(r) for r in request]
+                else:
+                    response = standin.rpc(request)
+            else:
+                response = standin.graphql(request)
+
+            body = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            pass
+
+    return Handler
+
+
+class StandIn:
+    """
+    Serves `state` on localhost from a background thread, for use as a context manager
+    :param `port`: 0 picks a free port
+    """
+
+    def __init__(self, state: SyntheticState, host: str = "127.0.0.1", port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), handler(StandInState(state)))
+        self.server.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def endpoints(self) -> dict[str, str]:
+        """Environment variables pointing the reporter at the stand-in"""
+        return {
+            "SUBGRAPH_SNAPSHOT": f"{self.url}/snapshot",
+            "SUBGRAPH_AUXO_STAKING": f"{self.url}/staking",
+            "SUBGRAPH_AUXO_GOV": f"{self.url}/gov",
+            "RPC_URL": f"{self.url}/rpc",
+        }
+
+    def __enter__(self) -> "StandIn":
+        self._thread = Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve synthetic subgraph and RPC state for benchmarking the reporter"
+    )
+    parser.add_argument(
+        "--epoch", required=True, help="epoch folder with epoch-conf.json"
+    )
+    parser.add_argument("--holders", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    conf = load_conf(args.epoch)
+    state = SyntheticState(
+        args.holders, conf.start_timestamp, conf.end_timestamp, seed=args.seed
+    )
+    standin = StandIn(state, port=args.port)
+    for name, url in standin.endpoints().items():
+        print(f"{name}={url}")
+    standin.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import random
+from dataclasses import dataclass, field
+
+"""
+Synthetic state for the stand-in server: ARV holders with locks and boosted balances,
+PRV depositors in the RollStaker, snapshot and governor votes, and compounding delegations.
+State is generated from a seed, so every run at a given size sees the same data.
+"""
+
+DAY = 24 * 60 * 60
+ETHER = 10**18
+
+ARV_TOTAL_SUPPLY_SLACK = 1.1  # tokens not held by stakers, eg: in the DAO treasury
+
+
+@dataclass
+class Holder:
+    """
+    :param `arv`: ARV balance, also the amount locked
+    :param `boosted`: DecayOracle balance, at most `arv` and never zero
+    :param `prv_deposit`: PRV deposited in the RollStaker, zero if not a depositor
+    :param `prv_active`: PRV earning rewards this epoch, zero for pending deposits
+    :param `delegates`: delegates claims to the ops multisig for compounding
+    """
+
+    address: str
+    arv: int
+    boosted: int
+    locked_at: int
+    lock_duration: int
+    prv_deposit: int
+    prv_active: int
+    delegates: bool
+
+
+@dataclass
+class SyntheticState:
+    """
+    :param `holders`: number of ARV holders, roughly half of whom also deposit PRV
+    :param `start`: first timestamp of the epoch, votes are cast between `start` and `end`
+    :param `end`: last timestamp of the epoch
+    :param `block`: block number reported for aggregate calls
+    :param `seed`: for the random generator
+    """
+
+    holders: int
+    start: int
+    end: int
+    block: int = 17_000_000
+    seed: int = 0
+    accounts: list[Holder] = field(init=False)
+    snapshot_votes: list[dict] = field(init=False)
+    governor_votes: list[dict] = field(init=False)
+
+    def __post_init__(self):
+        rng = random.Random(self.seed)
+        self.accounts = sorted(
+            (self.holder(rng) for _ in range(self.holders)), key=lambda h: h.address
+        )
+        self.by_address = {h.address: h for h in self.accounts}
+        self.depositors = [h for h in self.accounts if h.prv_deposit > 0]
+        self.snapshot_votes, self.governor_votes = self.votes(rng)
+
+    def holder(self, rng: random.Random) -> Holder:
+        arv = rng.randint(1, 100_000) * ETHER // 100
+        deposit = rng.randint(1, 100_000) * ETHER // 100 if rng.random() < 0.5 else 0
+        return Holder(
+            address=address(rng),
+            arv=arv,
+            boosted=max(1, arv * rng.randint(50, 100) // 100),
+            locked_at=self.start - rng.randint(0, 365) * DAY,
+            lock_duration=rng.randint(6, 36) * 30 * DAY,
+            prv_deposit=deposit,
+            prv_active=deposit if rng.random() < 0.9 else 0,
+            delegates=rng.random() < 0.05,
+        )
+
+    def votes(self, rng: random.Random) -> tuple[list[dict], list[dict]]:
+        """60% of holders vote, half of them on snapshot and half on the governor"""
+        proposals = [snapshot_proposal(rng, i, self.start) for i in range(3)]
+        governor = governor_proposal(rng, self.start)
+
+        snapshot_votes, governor_votes = [], []
+        for h in self.accounts:
+            if rng.random() >= 0.6:
+                continue
+            if rng.random() < 0.5:
+                snapshot_votes.append(
+                    {
+                        "id": f"0x{rng.getrandbits(256):064x}",
+                        "voter": h.address,
+                        "choice": rng.randint(1, 3),
+                        "created": rng.randint(self.start, self.end),
+                        "proposal": rng.choice(proposals),
+                    }
+                )
+            else:
+                governor_votes.append(
+                    {
+                        "receipt": {"reason": ""},
+                        "support": {"support": rng.randint(0, 2)},
+                        "proposal": governor,
+                        "governor": {"id": governor["id"].split("/")[0]},
+                        "voter": {"id": h.address},
+                        "timestamp": str(rng.randint(self.start + 1, self.end)),
+                    }
+                )
+
+        snapshot_votes.sort(key=lambda v: (v["created"], v["id"]))
+        for i, vote in enumerate(governor_votes):
+            vote["id"] = f"{self.block - len(governor_votes) + i:010d}-0"
+        return snapshot_votes, governor_votes
+
+    @property
+    def arv_total_supply(self) -> int:
+        return int(sum(h.arv for h in self.accounts) * ARV_TOTAL_SUPPLY_SLACK)
+
+    @property
+    def prv_total_supply(self) -> int:
+        return sum(h.prv_deposit for h in self.accounts)
+
+    @property
+    def voters(self) -> set[str]:
+        return {v["voter"] for v in self.snapshot_votes} | {
+            v["voter"]["id"] for v in self.governor_votes
+        }
+
+    def is_claimed(self, account_index: int) -> bool:
+        """A third of merkle tree recipients have already claimed"""
+        return account_index % 3 == 0
+
+
+def address(rng: random.Random) -> str:
+    return f"0x{rng.getrandbits(160):040x}"
+
+
+def snapshot_proposal(rng: random.Random, index: int, start: int) -> dict:
+    return {
+        "id": f"0x{rng.getrandbits(256):064x}",
+        "title": f"Proposal {index}",
+        "author": address(rng),
+        "created": start - DAY,
+        "start": start,
+        "end": start + 7 * DAY,
+        "choices": ["FOR", "AGAINST", "ABSTAIN"],
+    }
+
+
+def governor_proposal(rng: random.Random, start: int) -> dict:
+    governor = address(rng)
+    return {
+        "description": "# Onchain proposal",
+        "canceled": False,
+        "executed": True,
+        "id": f"{governor}/0x{rng.getrandbits(256):064x}",
+        "endBlock": "17050000",
+        "startBlock": "17000000",
+        "proposer": {"id": address(rng)},
+        "proposalCreated": [{"timestamp": str(start - DAY)}],
+    }
@@ -0,0 +1,77 @@
+import json
+from time import perf_counter
+
+import pytest
+
+from reporter import config
+from reporter.queries import graphql_cache, network_telemetry
+from reporter.queries.common import SUBGRAPHS
+from reporter.queries.rpc import get_w3
+from reporter.run_arv import run_arv
+from reporter.run_prv import run_prv
+from reporter.test.standin.server import StandIn
+from reporter.test.standin.state import SyntheticState
+from reporter.test.conftest import BENCHMARK_DISABLED, BENCHMARK_SKIP_REASON
+
+INPUT_CONFIG = "./reporter/test/scenario_testing/inputs/scenario-0.json"
+
+
+def create_epoch(monkeypatch, directory: str) -> str:
+    """Create an epoch folder, answering 'no' when asked to filter proposals"""
+    monkeypatch.setattr(
+        "builtins.input", lambda prompt="": INPUT_CONFIG if "config" in prompt else "N"
+    )
+    return config.main(directory)
+
+
+def point_reporter_at(monkeypatch, standin: StandIn) -> None:
+    endpoints = standin.endpoints()
+    monkeypatch.setattr(SUBGRAPHS, "SNAPSHOT", endpoints["SUBGRAPH_SNAPSHOT"])
+    monkeypatch.setattr(SUBGRAPHS, "AUXO_STAKING", endpoints["SUBGRAPH_AUXO_STAKING"])
+    monkeypatch.setattr(SUBGRAPHS, "AUXO_GOV", endpoints["SUBGRAPH_AUXO_GOV"])
+    monkeypatch.setattr(get_w3().provider, "endpoint_uri", endpoints["RPC_URL"])
+    # every run must reach the stand-in
+    monkeypatch.setattr(graphql_cache, "bypass", True)
+
+
+def run_epoch(monkeypatch, tmp_path, holders: int) -> tuple[str, SyntheticState, dict]:
+    """Run ARV then PRV against a stand-in holding `holders` ARV holders"""
+    epoch = create_epoch(monkeypatch, str(tmp_path))
+    conf = config.load_conf(epoch)
+    state = SyntheticState(holders, conf.start_timestamp, conf.end_timestamp)
+
+    timings = {}
+    network_telemetry.reset()
+    with StandIn(state) as standin:
+        point_reporter_at(monkeypatch, standin)
+
+        start = perf_counter()
+        run_arv(epoch, str(tmp_path))
+        timings["arv"] = perf_counter() - start
+
+        start = perf_counter()
+        run_prv(epoch, str(tmp_path))
+        timings["prv"] = perf_counter() - start
+    return epoch, state, timings
+
+
+def test_pipeline_against_standin(monkeypatch, tmp_path):
+    epoch, state, _ = run_epoch(monkeypatch, tmp_path, holders=300)
+
+    with open(f"{epoch}/claims-ARV.json") as f:
+        arv_recipients = {a.lower() for a in json.load(f)["recipients"]}
+    assert arv_recipients == state.voters
+
+    with open(f"{epoch}/claims-PRV.json") as f:
+        prv_recipients = {a.lower() for a in json.load(f)["recipients"]}
+    stakers = {h.address for h in state.accounts if h.prv_active > 0}
+    assert stakers <= prv_recipients
+
+
+@pytest.mark.skipif(BENCHMARK_DISABLED, reason=BENCHMARK_SKIP_REASON)
+@pytest.mark.parametrize("holders", [1_000, 10_000, 100_000])
+def test_benchmark_pipeline(monkeypatch, tmp_path, holders):
+    epoch, _, timings = run_epoch(monkeypatch, tmp_path, holders)
+
+    print(f"\n{holders} holders: ARV {timings['arv']:.1f}s, PRV {timings['prv']:.1f}s")
+    print(f"network telemetry written to {epoch}/perf/network.json")
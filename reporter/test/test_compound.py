@@ -58,6 +58,14 @@ def recipients_arv(monkeypatch, conf: CompoundConf):
         lambda *_: create_is_compounder_response(TestDataARV),
     )
 
+    monkeypatch.setattr(
+        "reporter.queries.compound.multicall_is_compounder_and_claimed",
+        lambda *_: (
+            create_is_compounder_response(TestDataARV),
+            create_is_claimed_response(TestDataARV),
+        ),
+    )
+
     fetch_and_write_compounders(conf, "ARV")
 
     with open(f"{TEST_REPORTS_DIR}/{conf.date}/compounding/recipients-ARV-0.json") as f:
@@ -77,6 +85,14 @@ def recipients_prv(monkeypatch, conf: CompoundConf):
         lambda *_: create_is_compounder_response(TestDataPRV),
     )
 
+    monkeypatch.setattr(
+        "reporter.queries.compound.multicall_is_compounder_and_claimed",
+        lambda *_: (
+            create_is_compounder_response(TestDataPRV),
+            create_is_claimed_response(TestDataPRV),
+        ),
+    )
+
     fetch_and_write_compounders(conf, "PRV")
 
     with open(f"{TEST_REPORTS_DIR}/{conf.date}/compounding/recipients-PRV-0.json") as f:
@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from reporter.queries.rpc import get_w3
+from reporter.test.conftest import BENCHMARK_DISABLED, BENCHMARK_SKIP_REASON
+
+# each takes a few hundred milliseconds to import
+HEAVY_MODULES = ["web3", "eth_utils", "multicall"]
+
+IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy} if m in sys.modules]}}))
+"""
+
+
+def fresh_import(module: str) -> dict:
+    """Import `module` in a new interpreter, returning how long it took and the heavy modules it loaded"""
+    script = IMPORT.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, check=True, text=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", ["reporter.config", "reporter.queries"])
+def test_import_defers_web3(module):
+    assert fresh_import(module)["loaded"] == []
+
+
+def test_w3_is_built_once():
+    assert get_w3() is get_w3()
+    assert "web3" in sys.modules
+
+
+@pytest.mark.skipif(BENCHMARK_DISABLED, reason=BENCHMARK_SKIP_REASON)
+@pytest.mark.parametrize(
+    "module, budget",
+    [("reporter.config", 0.25), ("reporter.queries", 0.6), ("reporter.run", 0.6)],
+)
+def test_benchmark_import_time(module, budget):
+    seconds = min(fresh_import(module)["seconds"] for _ in range(3))
+    print(f"\nimport {module}: {seconds * 1000:.0f}ms")
+    assert seconds < budget
@@ -1,9 +1,21 @@
 import json
+import threading
+import time
 import pytest
 from unittest.mock import Mock
 from reporter.errors import *
 from reporter.models import Config, Vote as OffChainVote
-from reporter.queries import graphql_iterate_query, extract_nested_graphql
+from reporter.queries import (
+    Pagination,
+    address_shards,
+    alias_pages,
+    graphql_iterate_pages,
+    graphql_iterate_sharded,
+    graphql_iterate_query,
+    extract_nested_graphql,
+    run_concurrently,
+    time_shards,
+)
 from reporter.test.conftest import (
     LIVE_CALLS_DISABLED,
     SKIP_REASON,
@@ -84,19 +96,23 @@ def test_extract_nested_graphql():
         extract_nested_graphql(response, access_path)
 
 
+def mock_transport(monkeypatch, response) -> Mock:
+    transport_post_mock = Mock(return_value=json.dumps(response).encode())
+    monkeypatch.setattr(
+        "reporter.queries.common.default_transport.post",
+        transport_post_mock,
+    )
+    return transport_post_mock
+
+
 def test_graphql_iterate_query_empty_response(monkeypatch):
     mock_response = None
-    mock_json = Mock(return_value=mock_response)
-    requests_post_mock = Mock(return_value=Mock(json=mock_json))
 
     url = "https://graphql.example.com"
     access_path = ["users", "edges", "node", "id"]
     params = {"query": "query {}"}
 
-    monkeypatch.setattr(
-        "reporter.queries.requests.post",
-        requests_post_mock,
-    )
+    mock_transport(monkeypatch, mock_response)
 
     with pytest.raises(EmptyQueryError):
         graphql_iterate_query(url, access_path, params, max_loops=5)
@@ -104,17 +120,12 @@ def test_graphql_iterate_query_empty_response(monkeypatch):
 
 def test_graphql_iterate_query_error_response(monkeypatch):
     mock_response = {"errors": [{"message": "An error occurred"}]}
-    mock_json = Mock(return_value=mock_response)
-    requests_post_mock = Mock(return_value=Mock(json=mock_json))
 
     url = "https://graphql.example.com"
     access_path = ["users", "edges", "node", "id"]
     params = {"query": "query {}"}
 
-    monkeypatch.setattr(
-        "reporter.queries.requests.post",
-        requests_post_mock,
-    )
+    mock_transport(monkeypatch, mock_response)
     with pytest.raises(EmptyQueryError):
         graphql_iterate_query(url, access_path, params)
 
@@ -133,26 +144,248 @@ def test_graphql_iterate_query_too_many_loops(monkeypatch):
             }
         }
     }
-    mock_json = Mock(return_value=mock_response)
-    requests_post_mock = Mock(return_value=Mock(json=mock_json))
 
     url = "https://graphql.example.com"
     access_path = ["users", "edges", "nodes"]
     params = {"query": "query {}", "variables": {"skip": 1}}
 
-    monkeypatch.setattr(
-        "reporter.queries.requests.post",
-        requests_post_mock,
-    )
+    mock_transport(monkeypatch, mock_response)
     with pytest.raises(TooManyLoopsError):
         graphql_iterate_query(url, access_path, params, max_loops=3)
 
 
+def test_graphql_iterate_query_cursor(monkeypatch):
+    pages = [
+        {"data": {"balances": [{"id": "0x1"}, {"id": "0x2"}]}},
+        {"data": {"balances": [{"id": "0x3"}]}},
+        {"data": {"balances": []}},
+    ]
+    cursors = []
+
+    def post(url, payload, hedge=False):
+        cursors.append(payload["variables"]["cursor"])
+        return json.dumps(pages[len(cursors) - 1]).encode()
+
+    monkeypatch.setattr("reporter.queries.common.default_transport.post", post)
+
+    params = {"query": "query {}", "variables": {"cursor": ""}}
+    results = graphql_iterate_query(
+        "https://graphql.example.com",
+        ["balances"],
+        params,
+        max_loops=0,
+        pagination=Pagination.CURSOR,
+    )
+
+    assert [r["id"] for r in results] == ["0x1", "0x2", "0x3"]
+    assert cursors == ["", "0x2", "0x3"]
+
+
+def test_graphql_iterate_query_cursor_inclusive(monkeypatch):
+    # an inclusive cursor returns the boundary rows again, these should be dropped
+    pages = [
+        {"data": {"votes": [{"id": "a", "created": 1}, {"id": "b", "created": 2}]}},
+        {"data": {"votes": [{"id": "b", "created": 2}, {"id": "c", "created": 2}]}},
+        {"data": {"votes": [{"id": "b", "created": 2}, {"id": "c", "created": 2}]}},
+    ]
+    cursors = []
+
+    def post(url, payload, hedge=False):
+        cursors.append(payload["variables"]["cursor"])
+        return json.dumps(pages[len(cursors) - 1]).encode()
+
+    monkeypatch.setattr("reporter.queries.common.default_transport.post", post)
+
+    params = {"query": "query {}", "variables": {"cursor": 0}}
+    results = graphql_iterate_query(
+        "https://graphql.example.com",
+        ["votes"],
+        params,
+        pagination=Pagination.CURSOR,
+        cursor_field="created",
+    )
+
+    assert [r["id"] for r in results] == ["a", "b", "c"]
+    assert cursors == [0, 2, 2]
+
+
+def test_graphql_iterate_query_cursor_stalled(monkeypatch):
+    # a full page sharing one `created` second returns the same rows forever
+    page = {"data": {"votes": [{"id": "a", "created": 5}, {"id": "b", "created": 5}]}}
+    monkeypatch.setattr(
+        "reporter.queries.common.default_transport.post",
+        lambda url, payload, hedge=False: json.dumps(page).encode(),
+    )
+
+    params = {
+        "query": "query($cursor: Int) { votes(first: 2, where: {created_gte: $cursor}) { id created } }",
+        "variables": {"cursor": 0},
+    }
+    with pytest.raises(PaginationStalledError):
+        graphql_iterate_query(
+            "https://graphql.example.com",
+            ["votes"],
+            params,
+            pagination=Pagination.CURSOR,
+            cursor_field="created",
+            pages_per_request=1,
+        )
+
+
+def test_alias_pages():
+    query = """
+        query($cursor: String) {
+            token {
+                balances(first: 1000, where: { id_gt: $cursor }) { id }
+            }
+        }
+    """
+    aliased, window = alias_pages(query, "balances", 2)
+
+    assert window == 2000
+    assert (
+        "p0: balances(first: 1000, where: { id_gt: $cursor } skip: 0) { id }" in aliased
+    )
+    assert (
+        "p1: balances(first: 1000, where: { id_gt: $cursor } skip: 1000) { id }"
+        in aliased
+    )
+    assert aliased.count("balances(") == 2
+
+
+def test_graphql_iterate_query_aliased_pages(monkeypatch):
+    rows = [{"id": f"0x{i}"} for i in range(5)]
+    requests = []
+
+    def post(url, payload, hedge=False):
+        variables = payload["variables"]
+        requests.append(dict(variables))
+        # serve 2 rows per alias after the cursor, as the graph would
+        after = [r for r in rows if r["id"] > variables["cursor"]]
+        data = {"p0": after[:2], "p1": after[2:4]}
+        return json.dumps({"data": {"token": data}}).encode()
+
+    monkeypatch.setattr("reporter.queries.common.default_transport.post", post)
+
+    query = "query { token { balances(first: 2, where: { id_gt: $cursor }) { id } } }"
+    params = {"query": query, "variables": {"cursor": "", "firstPage": True}}
+    results = graphql_iterate_query(
+        "https://graphql.example.com",
+        ["token", "balances"],
+        params,
+        pagination=Pagination.CURSOR,
+        pages_per_request=2,
+    )
+
+    assert [r["id"] for r in results] == [r["id"] for r in rows]
+    # the second request is short, so no trailing empty request is made
+    assert requests == [
+        {"cursor": "", "firstPage": True},
+        {"cursor": "0x3", "firstPage": False},
+    ]
+
+
+def test_graphql_iterate_pages_prefetches(monkeypatch):
+    pages = [
+        {"data": {"balances": [{"id": "0x1"}, {"id": "0x2"}]}},
+        {"data": {"balances": [{"id": "0x3"}]}},
+        {"data": {"balances": []}},
+    ]
+    cursors = []
+    second_page_requested = threading.Event()
+
+    def post(url, payload, hedge=False):
+        cursors.append(payload["variables"]["cursor"])
+        if len(cursors) == 2:
+            second_page_requested.set()
+        return json.dumps(pages[len(cursors) - 1]).encode()
+
+    monkeypatch.setattr("reporter.queries.common.default_transport.post", post)
+
+    params = {"query": "query {}", "variables": {"cursor": ""}}
+    stream = graphql_iterate_pages(
+        "https://graphql.example.com",
+        ["balances"],
+        params,
+        pagination=Pagination.CURSOR,
+    )
+
+    first = next(stream)
+    # the second page is requested while the first is being consumed
+    assert [r["id"] for r in first] == ["0x1", "0x2"]
+    assert second_page_requested.wait(timeout=1)
+    assert cursors == ["", "0x2"]
+
+    assert [[r["id"] for r in page] for page in stream] == [["0x3"]]
+    assert cursors == ["", "0x2", "0x3"]
+
+
+def test_address_shards():
+    assert address_shards(1) == ({"prefix": "0x"},)
+    assert [s["prefix"] for s in address_shards(16)][:3] == ["0x0", "0x1", "0x2"]
+    assert len(address_shards(100)) == 16
+    assert address_shards(256)[-1] == {"prefix": "0xff"}
+
+
+def test_time_shards():
+    shards = time_shards(100, 200, "lower", "upper", count=3)
+
+    assert shards[0]["lower"] == 100
+    assert shards[-1]["upper"] == 200
+    assert all(a["upper"] == b["lower"] for a, b in zip(shards, shards[1:]))
+    assert len(time_shards(100, 101, "lower", "upper", count=16)) == 1
+
+
+def test_graphql_iterate_sharded(monkeypatch):
+    rows = {
+        "0x0": [{"id": "0x0a"}, {"id": "0x0b"}],
+        "0x1": [{"id": "0x1a"}, {"id": "0x0b"}],
+    }
+    in_flight = threading.Barrier(2, timeout=1)
+
+    def post(url, payload, hedge=False):
+        variables = payload["variables"]
+        if variables["cursor"] == "":
+            # both shards must be requested before either can return
+            in_flight.wait()
+            page = rows[variables["prefix"]]
+        else:
+            page = []
+        return json.dumps({"data": {"balances": page}}).encode()
+
+    monkeypatch.setattr("reporter.queries.common.default_transport.post", post)
+
+    params = {"query": "query {}", "variables": {"cursor": "", "prefix": "0x"}}
+    results = graphql_iterate_sharded(
+        "https://graphql.example.com",
+        ["balances"],
+        params,
+        [{"prefix": "0x0"}, {"prefix": "0x1"}],
+        pagination=Pagination.CURSOR,
+    )
+
+    assert [r["id"] for r in results] == ["0x0a", "0x0b", "0x1a"]
+    # shards page on their own copies of the variables
+    assert params["variables"] == {"cursor": "", "prefix": "0x"}
+
+
+def test_run_concurrently():
+    def slow(value):
+        time.sleep(0.2)
+        return value
+
+    start = time.time()
+    results = run_concurrently(lambda: slow(1), lambda: slow(2), lambda: slow(3))
+
+    assert results == [1, 2, 3]
+    assert time.time() - start < 0.5
+
+
 @pytest.mark.skipif(LIVE_CALLS_DISABLED, reason=SKIP_REASON)
 def test_should_have_data(config: Config):
     config.start_timestamp = 1668781800 - 100
     config.end_timestamp = 1668781800 + 100
-    votes = get_onchain_votes(config)
+    votes = list(get_onchain_votes(config))
 
     assert len(votes) == 1
 
@@ -161,7 +394,7 @@ def test_should_have_data(config: Config):
 def test_should_not_have_data(config: Config):
     config.start_timestamp = 0
     config.end_timestamp = 1000
-    votes = get_onchain_votes(config)
+    votes = list(get_onchain_votes(config))
 
     assert len(votes) == 0
 